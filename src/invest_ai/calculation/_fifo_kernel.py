@@ -0,0 +1,44 @@
+"""Scalar FIFO allocation kernel over parallel lot arrays."""
+
+
+def allocate_many(
+    quantities: list[float], prices: list[float], sell_quantities: list[float]
+) -> tuple[list[float | None], int]:
+    """Allocate a sequence of sales against FIFO lots.
+
+    Works on plain floats only: ``quantities`` and ``prices`` describe the
+    lots in FIFO order and ``quantities`` is consumed in place. A sale the
+    remaining inventory cannot cover is skipped and leaves the lots
+    untouched.
+
+    Returns:
+        Tuple of (cost basis per sale, or None if skipped; index of the
+        first open lot)
+    """
+    lot_count = len(quantities)
+    available = sum(quantities)
+    head = 0
+    costs: list[float | None] = []
+
+    for sell_quantity in sell_quantities:
+        if available <= 0 or sell_quantity > available:
+            costs.append(None)
+            continue
+        available -= sell_quantity
+
+        remaining = sell_quantity
+        cost = 0.0
+        while remaining > 0 and head < lot_count:
+            lot_quantity = quantities[head]
+            if lot_quantity <= remaining:
+                cost += lot_quantity * prices[head]
+                remaining -= lot_quantity
+                quantities[head] = 0.0
+                head += 1
+            else:
+                cost += remaining * prices[head]
+                quantities[head] = lot_quantity - remaining
+                remaining = 0.0
+        costs.append(cost)
+
+    return costs, head
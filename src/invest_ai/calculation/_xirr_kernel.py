@@ -0,0 +1,252 @@
+"""Scalar XIRR root-finding kernels over parallel amount/year lists."""
+
+import math
+import struct
+
+# Rate bracket searched by both solvers
+MIN_RATE = -0.99
+MAX_RATE = 10.0
+
+# Consecutive secant steps allowed to overshoot the bracket before the
+# secant method gives up on it
+_MAX_DAMPED_STEPS = 2
+
+_DOUBLE = struct.Struct("<d")
+_INT64 = struct.Struct("<q")
+
+
+def _to_bits(value: float) -> int:
+    """Get the IEEE-754 bit pattern of a float as an integer."""
+    bits: int = _INT64.unpack(_DOUBLE.pack(value))[0]
+    return bits
+
+
+def _from_bits(bits: int) -> float:
+    """Get the float whose IEEE-754 bit pattern is bits."""
+    value: float = _DOUBLE.unpack(_INT64.pack(bits))[0]
+    return value
+
+
+def npv(rate: float, amounts: list[float], neg_years: list[float]) -> float:
+    """Calculate Net Present Value at given rate.
+
+    neg_years holds each cashflow's (negated) year offset, precomputed once
+    per solve rather than negated on every evaluation.
+    """
+    # amt / (1+rate)**yr == amt * exp(-yr * log1p(rate)), with the log
+    # hoisted out of the per-cashflow loop
+    log_base = math.log1p(rate)
+    exp = math.exp
+    return sum(amt * exp(ny * log_base) for amt, ny in zip(amounts, neg_years))
+
+
+def npv_and_derivative(
+    rate: float, amounts: list[float], neg_years: list[float]
+) -> tuple[float, float]:
+    """Calculate NPV and its derivative at given rate in one pass.
+
+    Each discounted amount is shared between the two sums, since
+    d/dr amt/(1+r)**yr = -yr * (amt/(1+r)**yr) / (1+r).
+    """
+    log_base = math.log1p(rate)
+    exp = math.exp
+    npv_value = 0.0
+    weighted = 0.0
+    for amt, ny in zip(amounts, neg_years):
+        discounted = amt * exp(ny * log_base)
+        npv_value += discounted
+        weighted += ny * discounted
+    return npv_value, weighted / (1 + rate)
+
+
+def _is_root(
+    rate: float, amounts: list[float], neg_years: list[float], tolerance: float
+) -> bool:
+    """Check that an iterative solver's converged rate is a real root.
+
+    A tiny step is not proof of convergence: after a step through a
+    clamped bound NPV explodes there and the following steps collapse far
+    from any root. Only an interior rate that NPV changes sign around is
+    accepted.
+    """
+    if rate <= MIN_RATE or rate >= MAX_RATE:
+        return False
+    step = 10 * tolerance
+    return (
+        npv(rate - step, amounts, neg_years) * npv(rate + step, amounts, neg_years)
+        <= 0
+    )
+
+
+# Range the initial guess is clamped to, well inside the bracket
+_GUESS_LOG_LOW = math.log1p(-0.5)
+_GUESS_LOG_HIGH = math.log1p(5.0)
+
+
+def initial_guess(amounts: list[float], years: list[float]) -> float:
+    """Estimate the rate from the money multiple over the cashflow span.
+
+    (inflows / outflows) ** (1 / span) - 1 lands close to the root for
+    large gains or losses, where a fixed 10% seed takes many steps. The
+    estimate is clamped to [-50%, 500%].
+    """
+    inflow = sum(amt for amt in amounts if amt > 0)
+    outflow = -sum(amt for amt in amounts if amt < 0)
+    if inflow <= 0 or outflow <= 0:
+        return 0.1
+    span = (years[-1] - years[0]) or 1.0
+    # Work in log space so a short span cannot overflow the power
+    log_rate = math.log(inflow / outflow) / span
+    log_rate = max(_GUESS_LOG_LOW, min(log_rate, _GUESS_LOG_HIGH))
+    return math.expm1(log_rate)
+
+
+def secant_xirr(
+    amounts: list[float],
+    years: list[float],
+    max_iterations: int,
+    tolerance: float,
+) -> float | None:
+    """Solve NPV(rate) = 0 with the secant method from initial_guess.
+
+    Each step needs a single NPV evaluation and no derivative, and the
+    method converges superlinearly (order ~1.618).
+
+    Returns:
+        The rate as a fraction, or None if the secant method did not converge
+        to a verified root
+    """
+    neg_years = [-yr for yr in years]
+    rate0 = initial_guess(amounts, years)
+    rate1 = rate0 + 0.01
+    damped_steps = 0
+    npv0 = npv(rate0, amounts, neg_years)
+
+    for _ in range(max_iterations):
+        npv1 = npv(rate1, amounts, neg_years)
+        if abs(npv1) < tolerance:
+            return rate1
+
+        if npv1 == npv0:
+            # Flat secant, caller falls back to another solver
+            return None
+
+        new_rate = rate1 - npv1 * (rate1 - rate0) / (npv1 - npv0)
+
+        # Keep the rate inside the bracket by stepping halfway to the bound
+        # it overshot, rather than pinning it where NPV explodes
+        if new_rate < MIN_RATE or new_rate > MAX_RATE:
+            damped_steps += 1
+            if damped_steps > _MAX_DAMPED_STEPS:
+                # Still heading out of the bracket: each damped step only
+                # halves the distance to the bound, so this would crawl
+                # on to a step below tolerance and fail the root check
+                return None
+            bound = MIN_RATE if new_rate < MIN_RATE else MAX_RATE
+            new_rate = (rate1 + bound) / 2
+        else:
+            damped_steps = 0
+
+        if abs(new_rate - rate1) < tolerance:
+            if _is_root(new_rate, amounts, neg_years, tolerance):
+                return new_rate
+            return None
+
+        rate0, npv0, rate1 = rate1, npv1, new_rate
+
+    return None
+
+
+def newton_xirr(
+    amounts: list[float],
+    years: list[float],
+    max_iterations: int,
+    tolerance: float,
+) -> float | None:
+    """Solve NPV(rate) = 0 with Newton-Raphson from initial_guess.
+
+    Slower per step than the secant method but steadier when cashflows
+    change sign more than once, so it backs up secant_xirr.
+
+    Returns:
+        The rate as a fraction, or None if Newton-Raphson did not converge
+        to a verified root
+    """
+    neg_years = [-yr for yr in years]
+    rate = initial_guess(amounts, years)
+    at_bound = False
+
+    for _ in range(max_iterations):
+        npv_value, npv_deriv = npv_and_derivative(rate, amounts, neg_years)
+
+        if abs(npv_deriv) < 1e-10:
+            # Derivative too small, caller falls back to bisection
+            return None
+
+        new_rate = rate - npv_value / npv_deriv
+
+        # Bound the rate to reasonable values
+        if new_rate <= MIN_RATE or new_rate >= MAX_RATE:
+            if at_bound:
+                # Clamped twice in a row: Newton is stuck at the bound
+                return None
+            at_bound = True
+            new_rate = max(MIN_RATE, min(new_rate, MAX_RATE))
+        else:
+            at_bound = False
+
+        if abs(new_rate - rate) < tolerance:
+            if _is_root(new_rate, amounts, neg_years, tolerance):
+                return new_rate
+            return None
+
+        rate = new_rate
+
+    return None
+
+
+def bisection_xirr(
+    amounts: list[float],
+    years: list[float],
+    tolerance: float,
+) -> float:
+    """Solve NPV(rate) = 0 by bisection over [MIN_RATE, MAX_RATE].
+
+    Bisects the bit pattern of 1 + rate rather than its value. 1 + rate is
+    positive across the bracket, where float ordering matches integer
+    ordering of the bit patterns, so the search reaches adjacent floats
+    in at most 64 steps however wide the bracket or close the root is
+    to zero.
+
+    Returns:
+        The rate as a fraction, or 0.0 if the bracket holds no root
+    """
+    neg_years = [-yr for yr in years]
+    low, high = MIN_RATE, MAX_RATE
+    npv_low = npv(low, amounts, neg_years)
+
+    # Check if solution exists in range
+    if npv_low * npv(high, amounts, neg_years) > 0:
+        return 0.0
+
+    low_bits = _to_bits(1 + low)
+    high_bits = _to_bits(1 + high)
+
+    for _ in range(64):
+        if high_bits - low_bits <= 1:
+            break
+        mid_bits = (low_bits + high_bits) >> 1
+        mid = _from_bits(mid_bits) - 1
+        npv_mid = npv(mid, amounts, neg_years)
+
+        if abs(npv_mid) < tolerance or (high - low) / 2 < tolerance:
+            return mid
+
+        # NPV at the low end is carried along instead of re-evaluated
+        if npv_low * npv_mid < 0:
+            high, high_bits = mid, mid_bits
+        else:
+            low, low_bits = mid, mid_bits
+            npv_low = npv_mid
+
+    return (low + high) / 2
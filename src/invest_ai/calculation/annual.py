@@ -1,5 +1,7 @@
 """Annual return calculation logic."""
 
+import math
+from collections import defaultdict
 from datetime import date
 from typing import Any
 
@@ -7,11 +9,12 @@ from invest_ai.models import (
     AnnualResult,
     CalculationResult,
     PriceData,
+    Transaction,
     TransactionList,
     TransactionType,
 )
 
-from .fifo import FifoCalculator
+from .fifo import POSITION_TYPES, FifoCalculator
 from .xirr import build_annual_cashflows, calculate_xirr
 
 
@@ -22,7 +25,7 @@ class AnnualCalculator:
         """Initialize the annual calculator."""
         self.fifo_calculator = FifoCalculator()
 
-    async def calculate_annual_returns(
+    def calculate_annual_returns(
         self,
         pre_year_transactions: TransactionList,
         year_transactions: TransactionList,
@@ -43,14 +46,13 @@ class AnnualCalculator:
         year_start_prices = prices.get("year_start", {})
         year_end_prices = prices.get("year_end", {})
 
-        # Calculate start value (position at year start using year-start prices)
-        start_value_result = await self.calculate_year_start_value(
-            pre_year_transactions, year_start_prices
-        )
-
-        # Calculate end value (position at year end) and realized gains
-        end_value_result = await self.calculate_year_end_performance(
-            pre_year_transactions, year_transactions, year_end_prices
+        # Start value (year-start prices) and end value plus realized gains
+        # (year-end prices) come from a single walk over each code's history
+        start_value_result, end_value_result = self._compute_start_and_end(
+            group_by_code(pre_year_transactions.transactions),
+            group_by_code(year_transactions.transactions),
+            year_start_prices,
+            year_end_prices,
         )
 
         # Calculate new investments during the year
@@ -77,10 +79,12 @@ class AnnualCalculator:
         year_end_date = get_year_end_trading_day(year)
         
         # Collect transaction cash flows
-        tx_cashflows: list[tuple[date, str, float]] = []
-        for tx in year_transactions.transactions:
-            if tx.transaction_date:
-                tx_cashflows.append((tx.transaction_date, tx.type.name, tx.total_amount))
+        # Streamed into the builder; no intermediate list
+        tx_cashflows = (
+            (tx.transaction_date, tx.type.name, tx.total_amount)
+            for tx in year_transactions.transactions
+            if tx.transaction_date
+        )
         
         # Build XIRR cash flows
         xirr_cashflows = build_annual_cashflows(
@@ -105,127 +109,159 @@ class AnnualCalculator:
             capital_gain=realized_gains,
         )
 
-    async def calculate_year_start_value(
+    def calculate_year_start_value(
         self,
         pre_year_transactions: TransactionList,
         year_start_prices: dict[str, PriceData],
+        pre_year_by_code: dict[str, list[Transaction]] | None = None,
     ) -> dict[str, Any]:
         """Calculate portfolio value at the start of the year.
         
         Args:
             pre_year_transactions: All transactions before the year
             year_start_prices: Prices at year start for each code
+            pre_year_by_code: Optional pre-year transactions already split by code
         """
-        if not pre_year_transactions.transactions:
-            return {"current_value": 0.0, "positions": {}}
+        if pre_year_by_code is None:
+            pre_year_by_code = group_by_code(pre_year_transactions.transactions)
 
-        # Calculate positions at year start using FIFO
-        codes = pre_year_transactions.get_codes()
-        total_value = 0.0
+        # Only the boundary snapshot is needed here, so no FIFO replay runs
+        start_value = 0.0
         positions = {}
-        
-        for code in codes:
-            code_transactions = pre_year_transactions.filter_by_code(code).transactions
-            
-            # Process FIFO to get remaining position
-            # Include BUY and DIVIDEND (stock dividends add shares)
-            fifo_calculator = FifoCalculator()
-            position_transactions = [
-                tx for tx in code_transactions 
-                if tx.type.name == "BUY" or (tx.type.name == "DIVIDEND" and tx.quantity > 0)
-            ]
-            if not position_transactions:
-                continue
-            fifo_queue = fifo_calculator.process_fifo_queue(position_transactions)
-            
-            # Process sells to update FIFO queue
-            for tx in code_transactions:
-                if tx.type.name == "SELL":
-                    try:
-                        result = fifo_calculator.allocate_cost(tx, fifo_queue)
-                        fifo_queue = result.remaining_queue
-                    except ValueError:
-                        continue
-            
-            # Calculate remaining shares
-            remaining_shares = sum(p.remaining_quantity for p in fifo_queue.purchases)
-            positions[code] = remaining_shares
-            
-            # Get price and calculate value
-            price_data = year_start_prices.get(code)
-            if price_data and remaining_shares > 0:
-                total_value += remaining_shares * price_data.price_value
-        
-        return {"current_value": total_value, "positions": positions}
+        for code, pre_code_transactions in pre_year_by_code.items():
+            position_transactions: list[Transaction] = []
+            sell_transactions: list[Transaction] = []
+            _split_lots_and_sells(
+                pre_code_transactions, position_transactions, sell_transactions
+            )
+            if position_transactions:
+                start_shares, code_value = self._start_position(
+                    position_transactions,
+                    sell_transactions,
+                    year_start_prices.get(code),
+                )
+                positions[code] = start_shares
+                start_value += code_value
+
+        return {"current_value": start_value, "positions": positions}
+
+    def _start_position(
+        self,
+        position_transactions: list[Transaction],
+        sell_transactions: list[Transaction],
+        price_data: PriceData | None,
+    ) -> tuple[float, float]:
+        """Get the shares held going into the year and their value.
+
+        Returns:
+            Tuple of (shares, value at the year-start price)
+        """
+        start_shares = self._remaining_after_sells(
+            position_transactions, sell_transactions
+        )
+        if price_data and start_shares > 0:
+            return start_shares, start_shares * price_data.price_value
+        return start_shares, 0.0
+
+    def _remaining_after_sells(
+        self,
+        position_transactions: list[Transaction],
+        sell_transactions: list[Transaction],
+    ) -> float:
+        """Count the shares still held after the given sells.
+
+        FIFO ordering only decides which lots a sell consumes, not how many
+        shares remain, so the position is the shares added by buys and stock
+        dividends minus every sell the inventory can cover.
+        """
+        held = sum(tx.quantity for tx in position_transactions)
+        for sell_tx in sell_transactions:
+            # Same rule as FifoCalculator.allocate_cost: uncovered sells are skipped
+            if held > 0 and sell_tx.quantity <= held:
+                held -= sell_tx.quantity
+        return held
 
     def calculate_withdrawals(self, year_transactions: TransactionList) -> float:
         """Calculate total withdrawals (sells) during the year."""
-        withdrawals = 0.0
-        for transaction in year_transactions.transactions:
-            if transaction.type.name == "SELL":
-                withdrawals += transaction.total_amount
-        return withdrawals
+        return self._sum_amounts(year_transactions, TransactionType.SELL)
 
-    async def calculate_year_end_performance(
+    def calculate_year_end_performance(
         self,
         pre_year_transactions: TransactionList,
         year_transactions: TransactionList,
         year_end_prices: dict[str, PriceData],
+        pre_year_by_code: dict[str, list[Transaction]] | None = None,
     ) -> dict[str, Any]:
         """Calculate year-end portfolio value and realized gains."""
-        # Combine all transactions for the year
-        all_transactions = TransactionList(
-            transactions=pre_year_transactions.transactions
-            + year_transactions.transactions
+        if pre_year_by_code is None:
+            pre_year_by_code = group_by_code(pre_year_transactions.transactions)
+
+        _, end_result = self._compute_start_and_end(
+            pre_year_by_code,
+            group_by_code(year_transactions.transactions),
+            {},
+            year_end_prices,
         )
+        return end_result
 
-        # Get unique investment codes
-        codes = all_transactions.get_codes()
+    def _compute_start_and_end(
+        self,
+        pre_year_by_code: dict[str, list[Transaction]],
+        year_by_code: dict[str, list[Transaction]],
+        year_start_prices: dict[str, PriceData],
+        year_end_prices: dict[str, PriceData],
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Compute year-start value and year-end performance in one pass per code.
 
+        Each code's pre-year and in-year transactions are classified once; the
+        year-start position is snapshotted at the year boundary and the same
+        lot lists then feed the FIFO replay for realized gains and end value.
+        """
+        start_value = 0.0
+        positions = {}
         individual_results = []
         total_current_value = 0.0
         total_realized_gains = 0.0
 
-        for code in codes:
-            # Get transactions for this code
-            code_transactions = all_transactions.filter_by_code(code).transactions
-
-            # Calculate FIFO for this code
-            # Include BUY and DIVIDEND (stock dividends add shares)
-            fifo_calculator = FifoCalculator()
-            position_transactions = [
-                tx for tx in code_transactions 
-                if tx.type.name == "BUY" or (tx.type.name == "DIVIDEND" and tx.quantity > 0)
-            ]
+        for code in pre_year_by_code.keys() | year_by_code.keys():
+            pre_code_transactions = pre_year_by_code.get(code, [])
+            year_code_transactions = year_by_code.get(code, [])
+
+            position_transactions: list[Transaction] = []
+            sell_transactions: list[Transaction] = []
+            _split_lots_and_sells(
+                pre_code_transactions, position_transactions, sell_transactions
+            )
+
+            # Year boundary: snapshot the shares held going into the year
+            if position_transactions:
+                start_shares, code_value = self._start_position(
+                    position_transactions,
+                    sell_transactions,
+                    year_start_prices.get(code),
+                )
+                positions[code] = start_shares
+                start_value += code_value
+
+            _split_lots_and_sells(
+                year_code_transactions, position_transactions, sell_transactions
+            )
+
             if not position_transactions:
                 continue
-            fifo_queue = fifo_calculator.process_fifo_queue(position_transactions)
-
-            # Calculate realized gains
-            sell_transactions = [
-                tx for tx in code_transactions if tx.type.name == "SELL"
-            ]
-            realized_gains = 0.0
-
-            for sell_tx in sell_transactions:
-                try:
-                    fifo_result = fifo_calculator.allocate_cost(sell_tx, fifo_queue)
-                    realized_gain = fifo_calculator.calculate_realized_gain(
-                        sell_tx, fifo_result.cost_basis
-                    )
-                    realized_gains += realized_gain
-                    fifo_queue = fifo_result.remaining_queue
-                except ValueError:
-                    # Skip invalid sales
-                    continue
+
+            code_transactions = pre_code_transactions + year_code_transactions
+
+            # Run the FIFO allocation for all of this code's sales at once
+            realized_gains, remaining_shares, remaining_cost = (
+                self.fifo_calculator.allocate_sales(
+                    position_transactions, sell_transactions
+                )
+            )
 
             # Calculate current value using year-end price
             current_price = year_end_prices.get(code)
             if current_price:
-                # Calculate remaining shares from FIFO queue
-                remaining_shares = sum(
-                    p.remaining_quantity for p in fifo_queue.purchases
-                )
                 current_value = remaining_shares * current_price.price_value
             else:
                 current_value = 0.0
@@ -235,24 +271,15 @@ class AnnualCalculator:
                 cost_basis = sum(
                     tx.total_amount
                     for tx in code_transactions
-                    if tx.type == TransactionType.BUY
-                )
-                total_gain = realized_gains + (
-                    current_value
-                    - sum(
-                        p.remaining_quantity * p.unit_price
-                        for p in fifo_queue.purchases
-                    )
+                    if tx.type is TransactionType.BUY
                 )
+                unrealized_gain = current_value - remaining_cost
+                total_gain = realized_gains + unrealized_gain
                 result = CalculationResult(
                     code=code,
-                    investment_type=code_transactions[0].get_investment_type(),
+                    investment_type=Transaction.classify_code(code),
                     realized_gain=realized_gains,
-                    unrealized_gain=current_value
-                    - sum(
-                        p.remaining_quantity * p.unit_price
-                        for p in fifo_queue.purchases
-                    ),
+                    unrealized_gain=unrealized_gain,
                     total_gain=total_gain,
                     cost_basis=cost_basis,
                     return_rate=(
@@ -262,7 +289,7 @@ class AnnualCalculator:
                     total_invested=sum(
                         tx.total_amount
                         for tx in code_transactions
-                        if tx.type.name == "BUY"
+                        if tx.type is TransactionType.BUY
                     ),
                 )
                 individual_results.append(result)
@@ -270,33 +297,33 @@ class AnnualCalculator:
             total_current_value += current_value
             total_realized_gains += realized_gains
 
-        return {
+        start_result = {"current_value": start_value, "positions": positions}
+        end_result = {
             "current_value": total_current_value,
             "realized_gains": total_realized_gains,
             "individual_results": individual_results,
         }
+        return start_result, end_result
 
     def calculate_new_investments(self, year_transactions: TransactionList) -> float:
         """Calculate total new investments during the year."""
-        new_investments = 0.0
-
-        for transaction in year_transactions.transactions:
-            if transaction.type.name == "BUY":
-                new_investments += transaction.total_amount
-
-        return new_investments
+        return self._sum_amounts(year_transactions, TransactionType.BUY)
 
     def calculate_dividend_income(self, year_transactions: TransactionList) -> float:
         """Calculate dividend income received during the year."""
-        dividend_income = 0.0
-
-        for transaction in year_transactions.transactions:
-            if transaction.type.name == "DIVIDEND":
-                dividend_income += transaction.total_amount
-
-        return dividend_income
+        return self._sum_amounts(year_transactions, TransactionType.DIVIDEND)
+
+    def _sum_amounts(
+        self, transactions: TransactionList, transaction_type: TransactionType
+    ) -> float:
+        """Sum total_amount of one transaction type with exact float summation."""
+        return math.fsum(
+            tx.total_amount
+            for tx in transactions.transactions
+            if tx.type is transaction_type
+        )
 
-    async def calculate_portfolio_annual_returns(
+    def calculate_portfolio_annual_returns(
         self,
         pre_year_transactions: TransactionList,
         year_transactions: TransactionList,
@@ -305,11 +332,36 @@ class AnnualCalculator:
     ) -> AnnualResult:
         """Calculate annual returns for the entire portfolio."""
         # This is similar to calculate_annual_returns but aggregates across all codes
-        return await self.calculate_annual_returns(
+        return self.calculate_annual_returns(
             pre_year_transactions, year_transactions, year, code=None, prices=prices
         )
 
 
+def _split_lots_and_sells(
+    transactions: list[Transaction],
+    position_transactions: list[Transaction],
+    sell_transactions: list[Transaction],
+) -> None:
+    """Append lot-opening transactions and sells to the given lists.
+
+    BUY and DIVIDEND with shares open lots (stock dividends add shares).
+    """
+    sell = TransactionType.SELL
+    for tx in transactions:
+        if tx.type in POSITION_TYPES and tx.quantity > 0:
+            position_transactions.append(tx)
+        elif tx.type is sell:
+            sell_transactions.append(tx)
+
+
+def group_by_code(transactions: list[Transaction]) -> dict[str, list[Transaction]]:
+    """Group transactions by investment code in a single pass, preserving order."""
+    by_code: defaultdict[str, list[Transaction]] = defaultdict(list)
+    for tx in transactions:
+        by_code[tx.code].append(tx)
+    return dict(by_code)
+
+
 def get_year_start_trading_day(year: int) -> date:
     """Get the first trading day of a year."""
     from ..market.trading_days import get_year_start_trading_day
@@ -36,7 +36,7 @@ class CalculationEngine:
             code: Optional specific investment code
             prices: Dict with 'year_start' and 'year_end' keys for price data
         """
-        return await self.annual_calculator.calculate_annual_returns(
+        return self.annual_calculator.calculate_annual_returns(
             pre_year_transactions, year_transactions, year, code, prices
         )
 
@@ -56,7 +56,7 @@ class CalculationEngine:
         self, transactions: TransactionList, current_prices: dict[str, PriceData]
     ) -> HistoryResult:
         """Calculate complete investment history."""
-        return await self.history_calculator.calculate_complete_history(
+        return self.history_calculator.calculate_complete_history(
             transactions, current_prices
         )
 
@@ -64,7 +64,7 @@ class CalculationEngine:
         self, transactions: TransactionList, code: str, current_prices: dict[str, PriceData]
     ) -> HistoryResult:
         """Calculate complete investment history for a specific code."""
-        return await self.history_calculator.calculate_single_investment_history(
+        return self.history_calculator.calculate_single_investment_history(
             transactions, code, current_prices
         )
 
@@ -1,5 +1,8 @@
 """FIFO (First-In-First-Out) cost allocation implementation."""
 
+from datetime import date
+from itertools import accumulate
+
 from invest_ai.models import (
     FifoQueue,
     FifoResult,
@@ -8,6 +11,21 @@ from invest_ai.models import (
     TransactionType,
 )
 
+from ._fifo_kernel import allocate_many
+
+# Transaction types that open FIFO lots (stock dividends add shares)
+POSITION_TYPES = frozenset({TransactionType.BUY, TransactionType.DIVIDEND})
+
+
+def _in_date_order(transactions: list[Transaction]) -> list[Transaction]:
+    """Get transactions sorted by date (stable, undated first).
+
+    These methods take plain lists, so order cannot be assumed; input from
+    a TransactionList is already sorted, which the sort detects in a
+    single linear pass.
+    """
+    return sorted(transactions, key=lambda tx: tx.transaction_date or date.min)
+
 
 class FifoCalculator:
     """Implements FIFO cost allocation for investment transactions."""
@@ -32,12 +50,15 @@ class FifoCalculator:
                 )
 
         queue = FifoQueue(code=code)
+        # Lots are appended directly in FIFO order
+        purchases = queue.purchases
 
-        # Sort transactions by date to maintain FIFO order
-        sorted_transactions = sorted(transactions, key=lambda x: x.date)
+        buy = TransactionType.BUY
+        dividend = TransactionType.DIVIDEND
 
-        for transaction in sorted_transactions:
-            if transaction.type == TransactionType.BUY:
+        for transaction in _in_date_order(transactions):
+            transaction_type = transaction.type
+            if transaction_type is buy:
                 # Add buy transaction to the queue
                 purchase = Purchase(
                     date=transaction.date,
@@ -45,9 +66,9 @@ class FifoCalculator:
                     unit_price=transaction.unit_price,
                     remaining_quantity=transaction.quantity,
                 )
-                queue.add_purchase(purchase)
+                purchases.append(purchase)
 
-            elif transaction.type == TransactionType.DIVIDEND:
+            elif transaction_type is dividend:
                 # Stock/mutual fund dividend - add shares without cost basis
                 dividend_purchase = Purchase(
                     date=transaction.date,
@@ -55,7 +76,7 @@ class FifoCalculator:
                     unit_price=0.0,  # No cost basis for dividends
                     remaining_quantity=transaction.quantity,
                 )
-                queue.add_purchase(dividend_purchase)
+                purchases.append(dividend_purchase)
 
             # Sell transactions are handled separately in allocate_cost()
 
@@ -64,7 +85,10 @@ class FifoCalculator:
     def allocate_cost(
         self, sell_transaction: Transaction, fifo_queue: FifoQueue
     ) -> FifoResult:
-        """Allocate cost for a sell transaction using FIFO."""
+        """Allocate cost for a sell transaction using FIFO.
+
+        The queue is consumed in place and returned as remaining_queue.
+        """
         if sell_transaction.type != TransactionType.SELL:
             raise ValueError(
                 f"Transaction must be SELL type, got {sell_transaction.type}"
@@ -73,42 +97,47 @@ class FifoCalculator:
         if not fifo_queue.has_inventory:
             raise ValueError("No inventory available to allocate")
 
+        # Check coverage up front so a failed sale leaves the queue untouched
+        available_quantity = fifo_queue.get_total_quantity()
+        if available_quantity < sell_transaction.quantity:
+            raise ValueError(
+                f"Insufficient inventory: trying to sell {sell_transaction.quantity}, "
+                f"but only {available_quantity} available"
+            )
+
         allocated_purchases = []
         remaining_sell_quantity = sell_transaction.quantity
         total_cost_basis = 0.0
 
-        # Create a copy of the queue to work with
-        working_queue = FifoQueue(code=fifo_queue.code)
-
-        # Copy existing purchases
-        for purchase in fifo_queue.purchases:
-            purchase_copy = Purchase(
-                date=purchase.date,
-                quantity=purchase.quantity,
-                unit_price=purchase.unit_price,
-                remaining_quantity=purchase.remaining_quantity,
-            )
-            working_queue.add_purchase(purchase_copy)
+        # Consume lots in place from the front of the queue; the caller threads
+        # the same queue into the next sale, so no copy is needed
+        purchases = fifo_queue.purchases
+        lot_count = len(purchases)
+        index = 0
+        consumed = 0
 
-        # Allocate from earliest purchases
+        # Allocate from earliest purchases, reading each lot's fields once
         while remaining_sell_quantity > 0:
-            next_purchase = working_queue.get_next_purchase()
-            if next_purchase is None:
-                # Not enough inventory to cover the sale
+            while index < lot_count and purchases[index].remaining_quantity <= 0:
+                index += 1
+            if index == lot_count:
+                # Only reachable through float rounding on an exact full sale
                 raise ValueError(
                     f"Insufficient inventory: trying to sell {sell_transaction.quantity}, "
                     f"but only {sell_transaction.quantity - remaining_sell_quantity} available"
                 )
-            # At this point, next_purchase is guaranteed to be not None
+            next_purchase = purchases[index]
+            lot_quantity = next_purchase.remaining_quantity
+            unit_price = next_purchase.unit_price
 
-            if next_purchase.remaining_quantity <= remaining_sell_quantity:
+            if lot_quantity <= remaining_sell_quantity:
                 # Take the entire remaining quantity of this purchase
-                allocated_purchases.append(next_purchase)
-                total_cost_basis += (
-                    next_purchase.remaining_quantity * next_purchase.unit_price
-                )
-                remaining_sell_quantity -= next_purchase.remaining_quantity
+                total_cost_basis += lot_quantity * unit_price
+                remaining_sell_quantity -= lot_quantity
                 next_purchase.remaining_quantity = 0
+                allocated_purchases.append(next_purchase)
+                index += 1
+                consumed = index
 
             else:
                 # Take a partial quantity from this purchase
@@ -116,26 +145,65 @@ class FifoCalculator:
                 partial_purchase = Purchase(
                     date=next_purchase.date,
                     quantity=next_purchase.quantity,
-                    unit_price=next_purchase.unit_price,
+                    unit_price=unit_price,
                     remaining_quantity=allocated_quantity,
                 )
                 allocated_purchases.append(partial_purchase)
-                total_cost_basis += allocated_quantity * next_purchase.unit_price
-                next_purchase.remaining_quantity -= allocated_quantity
+                total_cost_basis += allocated_quantity * unit_price
+                next_purchase.remaining_quantity = lot_quantity - allocated_quantity
                 remaining_sell_quantity = 0
 
-        # Create the remaining queue after allocations
-        remaining_fifo = FifoQueue(code=fifo_queue.code)
-        for purchase in working_queue.purchases:
-            if purchase.remaining_quantity > 0:
-                remaining_fifo.add_purchase(purchase)
+        # Drop the fully consumed lots at the head of the queue
+        del purchases[:consumed]
 
         return FifoResult(
             code=fifo_queue.code,
             allocated_purchases=allocated_purchases,
             cost_basis=total_cost_basis,
-            remaining_queue=remaining_fifo,
+            remaining_queue=fifo_queue,
+        )
+
+    def allocate_sales(
+        self,
+        position_transactions: list[Transaction],
+        sell_transactions: list[Transaction],
+    ) -> tuple[float, float, float]:
+        """Run every sale of one code against its lots in a single pass.
+
+        Lots are kept as parallel quantity/price lists and run through the
+        scalar allocate_many kernel instead of Purchase objects; sales the
+        inventory cannot cover are skipped exactly as allocate_cost would
+        reject them.
+
+        Returns:
+            Tuple of (realized_gains, remaining_shares, remaining_cost)
+        """
+        # Lots are consumed in date order, as in process_fifo_queue
+        lots = _in_date_order(position_transactions)
+        quantities = [tx.quantity for tx in lots]
+        prices = [
+            tx.unit_price if tx.type is TransactionType.BUY else 0.0 for tx in lots
+        ]
+        lot_count = len(lots)
+
+        sell_transactions = _in_date_order(sell_transactions)
+        costs, head = allocate_many(
+            quantities, prices, [tx.quantity for tx in sell_transactions]
         )
+        realized_gains = 0.0
+        for sell_tx, cost_basis in zip(sell_transactions, costs):
+            if cost_basis is not None:
+                realized_gains += sell_tx.total_amount - cost_basis
+
+        # Shares and cost of the open lots in one pass
+        remaining_shares = 0.0
+        remaining_cost = 0.0
+        for index in range(head, lot_count):
+            lot_quantity = quantities[index]
+            remaining_shares += lot_quantity
+            remaining_cost += lot_quantity * prices[index]
+
+        return realized_gains, remaining_shares, remaining_cost
 
     def calculate_realized_gain(
         self, sell_transaction: Transaction, cost_basis: float
@@ -163,25 +231,33 @@ class FifoCalculator:
         else:
             queue = initial_queue
 
-        # Sort sell transactions by date
-        sell_transactions = sorted(
-            [tx for tx in transactions if tx.type == TransactionType.SELL],
-            key=lambda x: x.date,
+        # Sell transactions in date order
+        sell_transactions = _in_date_order(
+            [tx for tx in transactions if tx.type == TransactionType.SELL]
         )
 
         results = []
         for sell_transaction in sell_transactions:
-            try:
-                fifo_result = self.allocate_cost(sell_transaction, queue)
-                results.append(fifo_result)
-                queue = fifo_result.remaining_queue
-            except ValueError as e:
-                # Handle insufficient inventory (shouldn't happen with proper validation)
+            # Check coverage here instead of catching allocate_cost's error
+            available_quantity = queue.get_total_quantity()
+            if available_quantity <= 0 or available_quantity < sell_transaction.quantity:
+                # Insufficient inventory (shouldn't happen with proper validation)
                 error_result = FifoResult(
-                    allocated_purchases=[], cost_basis=0.0, remaining_queue=queue
+                    code=queue.code,
+                    allocated_purchases=[],
+                    cost_basis=0.0,
+                    remaining_queue=queue,
                 )
                 results.append(error_result)
-                print(f"Warning: {e}")
+                print(
+                    f"Warning: Insufficient inventory: trying to sell "
+                    f"{sell_transaction.quantity}, but only {available_quantity} available"
+                )
+                continue
+
+            fifo_result = self.allocate_cost(sell_transaction, queue)
+            results.append(fifo_result)
+            queue = fifo_result.remaining_queue
 
         return results, queue
 
@@ -205,24 +281,24 @@ class FifoCalculator:
         """Validate transactions for FIFO processing."""
         errors = []
 
-        # Sort transactions by date
-        sorted_transactions = sorted(transactions, key=lambda x: x.date)
-
-        # Track positions
-        position: float = 0
-
-        for i, transaction in enumerate(sorted_transactions):
-            if transaction.type == TransactionType.BUY:
-                position += transaction.quantity
-            elif transaction.type == TransactionType.SELL:
-                position -= transaction.quantity
-
-                if position < 0:
-                    error_msg = (
-                        f"Negative position at transaction {i + 1} "
-                        f"({transaction.code} on {transaction.date}): "
-                        f"Position = {position}"
-                    )
-                    errors.append(error_msg)
+        buy = TransactionType.BUY
+        sell = TransactionType.SELL
+
+        # Running positions in one accumulate over date-ordered transactions
+        transactions = _in_date_order(transactions)
+        signed_quantities = [
+            tx.quantity if tx.type is buy else -tx.quantity if tx.type is sell else 0.0
+            for tx in transactions
+        ]
+
+        for i, position in enumerate(accumulate(signed_quantities)):
+            if position < 0 and transactions[i].type is sell:
+                transaction = transactions[i]
+                error_msg = (
+                    f"Negative position at transaction {i + 1} "
+                    f"({transaction.code} on {transaction.date}): "
+                    f"Position = {position}"
+                )
+                errors.append(error_msg)
 
         return errors
@@ -1,15 +1,18 @@
 """Complete history calculation logic."""
 
+from collections import defaultdict
 from datetime import date
 
 from invest_ai.models import (
     CalculationResult,
     HistoryResult,
     PriceData,
+    Transaction,
     TransactionList,
+    TransactionType,
 )
 
-from .fifo import FifoCalculator
+from .fifo import POSITION_TYPES, FifoCalculator
 from .xirr import build_history_cashflows, calculate_xirr
 
 
@@ -20,7 +23,7 @@ class HistoryCalculator:
         """Initialize the history calculator."""
         self.fifo_calculator = FifoCalculator()
 
-    async def calculate_complete_history(
+    def calculate_complete_history(
         self, transactions: TransactionList, current_prices: dict[str, PriceData]
     ) -> HistoryResult:
         """Calculate complete history for transactions."""
@@ -29,24 +32,36 @@ class HistoryCalculator:
 
         # Get investment details
         investment_type = transactions.transactions[0].get_investment_type()
-        first_transaction = min(transactions.transactions, key=lambda x: x.date)
-        last_transaction = max(transactions.transactions, key=lambda x: x.date)
-
-        # Calculate core metrics
-        total_invested = self.calculate_total_invested(transactions)
-        current_value = self.calculate_current_value(transactions, current_prices)
-        realized_gains, unrealized_gains = self.calculate_gains(
-            transactions, current_prices
+        # TransactionList keeps transactions in date order
+        first_transaction = transactions.transactions[0]
+        last_transaction = transactions.transactions[-1]
+
+        # Calculate core metrics: one pass buckets by code and sums the
+        # invested/dividend totals
+        by_code, total_invested, dividend_income = self._bucket(transactions)
+
+        # Calculate individual investment results; FIFO runs once per code
+        # here and the portfolio totals are summed from these results
+        individual_results = self.calculate_individual_results(
+            transactions, current_prices, by_code
         )
-        dividend_income = self.calculate_dividend_income(transactions)
+        current_value = 0.0
+        realized_gains = 0.0
+        unrealized_gains = 0.0
+        for code_result in individual_results:
+            realized_gains += code_result.realized_gain
+            unrealized_gains += code_result.unrealized_gain or 0.0
+            current_value += code_result.current_value
 
         total_gain = realized_gains + unrealized_gains
         
         # Calculate return rate using XIRR (professional method)
-        tx_cashflows: list[tuple[date, str, float]] = []
-        for tx in transactions.transactions:
-            if tx.transaction_date:
-                tx_cashflows.append((tx.transaction_date, tx.type.name, tx.total_amount))
+        # Streamed into the builder; no intermediate list
+        tx_cashflows = (
+            (tx.transaction_date, tx.type.name, tx.total_amount)
+            for tx in transactions.transactions
+            if tx.transaction_date
+        )
         
         # Use today or last transaction date as end date
         end_date = last_transaction.date if last_transaction.date else date.today()
@@ -58,11 +73,6 @@ class HistoryCalculator:
         )
         return_rate = calculate_xirr(xirr_cashflows)
 
-        # Calculate individual investment results
-        individual_results = await self.calculate_individual_results(
-            transactions, current_prices
-        )
-
         return HistoryResult(
             investment_type=investment_type,
             code=None,  # For portfolio calculation
@@ -79,7 +89,7 @@ class HistoryCalculator:
             investments=individual_results,
         )
 
-    async def calculate_single_investment_history(
+    def calculate_single_investment_history(
         self,
         transactions: TransactionList,
         code: str,
@@ -93,7 +103,7 @@ class HistoryCalculator:
             raise ValueError(f"No transactions found for investment code: {code}")
 
         # Use the main history calculation
-        result = await self.calculate_complete_history(
+        result = self.calculate_complete_history(
             code_transactions, current_prices
         )
 
@@ -114,17 +124,18 @@ class HistoryCalculator:
             investments=result.investments,
         )
 
-    async def calculate_portfolio_history(
+    def calculate_portfolio_history(
         self, transactions: TransactionList, current_prices: dict[str, PriceData]
     ) -> HistoryResult:
         """Calculate history for entire portfolio."""
-        return await self.calculate_complete_history(transactions, current_prices)
+        return self.calculate_complete_history(transactions, current_prices)
 
     def calculate_total_invested(self, transactions: TransactionList) -> float:
         """Calculate total amount invested."""
         total = 0.0
+        buy = TransactionType.BUY
         for transaction in transactions.transactions:
-            if transaction.type.name == "BUY":
+            if transaction.type is buy:
                 total += transaction.total_amount
         return total
 
@@ -132,13 +143,13 @@ class HistoryCalculator:
         self, transactions: TransactionList, current_prices: dict[str, PriceData]
     ) -> float:
         """Calculate current market value of holdings."""
-        # Get unique investment codes
-        codes = transactions.get_codes()
+        # Split by code in one pass rather than filtering once per code
+        by_code, _, _ = self._bucket(transactions)
         total_value = 0.0
 
-        for code in codes:
-            code_value = self.calculate_code_current_value(
-                transactions, code, current_prices
+        for code, code_transactions in by_code.items():
+            _, _, code_value = self._process_code(
+                code_transactions, current_prices.get(code)
             )
             total_value += code_value
 
@@ -151,54 +162,24 @@ class HistoryCalculator:
         current_prices: dict[str, PriceData],
     ) -> float:
         """Calculate current value for a specific code."""
-        # Get transactions for this code
         code_transactions = transactions.filter_by_code(code).transactions
-
-        if not code_transactions:
-            return 0.0
-
-        # Process FIFO to get remaining position
-        # Include BUY and DIVIDEND (stock dividends add shares)
-        position_transactions = [
-            tx for tx in code_transactions 
-            if tx.type.name == "BUY" or (tx.type.name == "DIVIDEND" and tx.quantity > 0)
-        ]
-        if not position_transactions:
-            return 0.0
-        sell_transactions = [tx for tx in code_transactions if tx.type.name == "SELL"]
-
-        fifo_queue = self.fifo_calculator.process_fifo_queue(position_transactions)
-
-        # Process sells to update remaining position
-        for sell_tx in sell_transactions:
-            try:
-                fifo_result = self.fifo_calculator.allocate_cost(sell_tx, fifo_queue)
-                fifo_queue = fifo_result.remaining_queue
-            except ValueError:
-                # Skip invalid sales
-                continue
-
-        # Calculate remaining shares
-        remaining_shares = sum(p.remaining_quantity for p in fifo_queue.purchases)
-
-        # Get current price
-        current_price_data = current_prices.get(code)
-        if not current_price_data:
-            return 0.0
-
-        return remaining_shares * current_price_data.price_value
+        _, _, current_value = self._process_code(
+            code_transactions, current_prices.get(code)
+        )
+        return current_value
 
     def calculate_gains(
         self, transactions: TransactionList, current_prices: dict[str, PriceData]
     ) -> tuple[float, float]:
         """Calculate realized and unrealized gains."""
-        codes = transactions.get_codes()
+        # Split by code in one pass rather than filtering once per code
+        by_code, _, _ = self._bucket(transactions)
         total_realized = 0.0
         total_unrealized = 0.0
 
-        for code in codes:
-            realized, unrealized = self.calculate_code_gains(
-                transactions, code, current_prices
+        for code, code_transactions in by_code.items():
+            realized, unrealized, _ = self._process_code(
+                code_transactions, current_prices.get(code)
             )
             total_realized += realized
             total_unrealized += unrealized
@@ -213,109 +194,148 @@ class HistoryCalculator:
     ) -> tuple[float, float]:
         """Calculate gains for a specific code."""
         code_transactions = transactions.filter_by_code(code).transactions
+        realized_gains, unrealized_gains, _ = self._process_code(
+            code_transactions, current_prices.get(code)
+        )
+        return realized_gains, unrealized_gains
 
-        if not code_transactions:
-            return 0.0, 0.0
+    def _bucket(
+        self, transactions: TransactionList
+    ) -> tuple[dict[str, list[Transaction]], float, float]:
+        """Group transactions by code and sum invested/dividend totals in one pass.
+
+        Returns:
+            Tuple of (transactions by code, total invested, dividend income)
+        """
+        by_code: defaultdict[str, list[Transaction]] = defaultdict(list)
+        total_invested = 0.0
+        dividend_income = 0.0
+        buy = TransactionType.BUY
+        dividend = TransactionType.DIVIDEND
+
+        for transaction in transactions.transactions:
+            by_code[transaction.code].append(transaction)
+            if transaction.type is buy:
+                total_invested += transaction.total_amount
+            elif transaction.type is dividend:
+                dividend_income += transaction.total_amount
+
+        return dict(by_code), total_invested, dividend_income
+
+    def _process_code(
+        self, code_transactions: list[Transaction], price_data: PriceData | None
+    ) -> tuple[float, float, float]:
+        """Run FIFO once for one code's transactions.
+
+        Returns:
+            Tuple of (realized gains, unrealized gains, current value)
+        """
+        totals = self._fifo_totals(code_transactions)
+        if totals is None:
+            return 0.0, 0.0, 0.0
+        realized_gains, remaining_shares, remaining_cost_basis = totals
+
+        if not price_data:
+            return realized_gains, 0.0, 0.0
+
+        current_value = remaining_shares * price_data.price_value
+        return realized_gains, current_value - remaining_cost_basis, current_value
+
+    def _fifo_totals(
+        self, code_transactions: list[Transaction]
+    ) -> tuple[float, float, float] | None:
+        """Get (realized gains, remaining shares, remaining cost) for one code.
+
+        Returns None if the code has no position transactions.
+        """
+        sell = TransactionType.SELL
 
-        # Process FIFO
         # Include BUY and DIVIDEND (stock dividends add shares)
         position_transactions = [
-            tx for tx in code_transactions 
-            if tx.type.name == "BUY" or (tx.type.name == "DIVIDEND" and tx.quantity > 0)
+            tx for tx in code_transactions
+            if tx.type in POSITION_TYPES and tx.quantity > 0
         ]
         if not position_transactions:
-            return 0.0, 0.0
-        sell_transactions = [tx for tx in code_transactions if tx.type.name == "SELL"]
-
-        fifo_queue = self.fifo_calculator.process_fifo_queue(position_transactions)
-        realized_gains = 0.0
+            return None
+        sell_transactions = [tx for tx in code_transactions if tx.type is sell]
 
-        # Calculate realized gains from sells
-        for sell_tx in sell_transactions:
-            try:
-                fifo_result = self.fifo_calculator.allocate_cost(sell_tx, fifo_queue)
-                realized_gain = self.fifo_calculator.calculate_realized_gain(
-                    sell_tx, fifo_result.cost_basis
-                )
-                realized_gains += realized_gain
-                fifo_queue = fifo_result.remaining_queue
-            except ValueError:
-                continue
-
-        # Calculate unrealized gains from remaining position
-        remaining_shares = sum(p.remaining_quantity for p in fifo_queue.purchases)
-        remaining_cost_basis = sum(
-            p.remaining_quantity * p.unit_price for p in fifo_queue.purchases
+        return self.fifo_calculator.allocate_sales(
+            position_transactions, sell_transactions
         )
 
-        current_price_data = current_prices.get(code)
-        if current_price_data:
-            current_value = remaining_shares * current_price_data.price_value
-            unrealized_gains = current_value - remaining_cost_basis
-        else:
-            unrealized_gains = 0.0
-
-        return realized_gains, unrealized_gains
-
     def calculate_dividend_income(self, transactions: TransactionList) -> float:
         """Calculate total dividend income."""
         dividend_income = 0.0
+        dividend = TransactionType.DIVIDEND
         for transaction in transactions.transactions:
-            if transaction.type.name == "DIVIDEND":
+            if transaction.type is dividend:
                 dividend_income += transaction.total_amount
 
         return dividend_income
 
-    async def calculate_individual_results(
-        self, transactions: TransactionList, current_prices: dict[str, PriceData]
+    def calculate_individual_results(
+        self,
+        transactions: TransactionList,
+        current_prices: dict[str, PriceData],
+        by_code: dict[str, list[Transaction]] | None = None,
     ) -> list[CalculationResult]:
-        """Calculate results for individual investments."""
-        codes = transactions.get_codes()
+        """Calculate results for individual investments.
+
+        Args:
+            transactions: All transactions
+            current_prices: Current price for each code
+            by_code: Optional transactions already split by code
+        """
+        if by_code is None:
+            by_code, _, _ = self._bucket(transactions)
         individual_results = []
 
-        for code in codes:
-            code_result = await self.calculate_code_result(
-                transactions, code, current_prices
+        for code, code_transactions in by_code.items():
+            code_result = self.calculate_code_result(
+                transactions, code, current_prices, code_transactions
             )
             individual_results.append(code_result)
 
         return individual_results
 
-    async def calculate_code_result(
+    def calculate_code_result(
         self,
         transactions: TransactionList,
         code: str,
         current_prices: dict[str, PriceData],
+        code_transactions: list[Transaction] | None = None,
     ) -> CalculationResult:
         """Calculate result for a specific code."""
-        code_transactions = transactions.filter_by_code(code).transactions
+        if code_transactions is None:
+            code_transactions = transactions.filter_by_code(code).transactions
 
         if not code_transactions:
             raise ValueError(f"No transactions found for code: {code}")
 
         investment_type = code_transactions[0].get_investment_type()
         total_invested = sum(
-            tx.total_amount for tx in code_transactions if tx.type.name == "BUY"
+            tx.total_amount
+            for tx in code_transactions
+            if tx.type is TransactionType.BUY
         )
 
-        realized, unrealized = self.calculate_code_gains(
-            transactions, code, current_prices
+        # One FIFO pass yields gains and current value together
+        realized, unrealized, current_value = self._process_code(
+            code_transactions, current_prices.get(code)
         )
         total_gain = realized + unrealized
         
-        current_value = self.calculate_code_current_value(
-            transactions, code, current_prices
-        )
-        
         # Calculate return rate using XIRR (professional method)
-        tx_cashflows: list[tuple[date, str, float]] = []
-        for tx in code_transactions:
-            if tx.transaction_date:
-                tx_cashflows.append((tx.transaction_date, tx.type.name, tx.total_amount))
+        # Streamed into the builder; no intermediate list
+        tx_cashflows = (
+            (tx.transaction_date, tx.type.name, tx.total_amount)
+            for tx in code_transactions
+            if tx.transaction_date
+        )
         
         # Find last transaction date for this code
-        last_tx = max(code_transactions, key=lambda x: x.date) if code_transactions else None
-        end_date = last_tx.date if last_tx and last_tx.date else date.today()
+        last_tx = code_transactions[-1]
+        end_date = last_tx.date if last_tx.date else date.today()
         
         xirr_cashflows = build_history_cashflows(
             transactions=tx_cashflows,
@@ -116,31 +116,37 @@ class PriceDataCache:
 
     def __init__(self) -> None:
         """Initialize price cache."""
-        self.cache: dict[str, dict[date, PriceData]] = {}
+        # Keyed by (code, date) for a single hash lookup per access
+        self.cache: dict[tuple[str, date], PriceData] = {}
+        # Latest cached date per code, so get_latest_price_data is O(1)
+        self._latest: dict[str, date] = {}
 
     def add_price_data(self, code: str, price_data: PriceData) -> None:
         """Add price data to cache."""
-        if code not in self.cache:
-            self.cache[code] = {}
-        self.cache[code][price_data.price_date] = price_data
+        price_date = price_data.price_date
+        self.cache[(code, price_date)] = price_data
+        if price_date > self._latest.get(code, date.min):
+            self._latest[code] = price_date
 
     def get_price_data(self, code: str, target_date: date) -> PriceData | None:
         """Get price data from cache."""
-        return self.cache.get(code, {}).get(target_date)
+        return self.cache.get((code, target_date))
 
     def get_latest_price_data(self, code: str) -> PriceData | None:
         """Get latest price data for a code."""
-        if code not in self.cache or not self.cache[code]:
+        latest_date = self._latest.get(code)
+        if latest_date is None:
             return None
-        return max(self.cache[code].items(), key=lambda x: x[0])[1]
+        return self.cache[(code, latest_date)]
 
     def clear(self) -> None:
         """Clear cache."""
         self.cache.clear()
+        self._latest.clear()
 
     def size(self) -> int:
         """Get cache size."""
-        return sum(len(dates) for dates in self.cache.values())
+        return len(self.cache)
 
 
 class PerformanceMetrics:
@@ -4,7 +4,28 @@ XIRR is the standard method for calculating annualized returns on investments
 with irregular cash flows. It considers the timing of each cash flow.
 """
 
+import math
+from collections.abc import Callable, Iterable
 from datetime import date
+from functools import lru_cache
+
+from ._xirr_kernel import (
+    MAX_RATE,
+    MIN_RATE,
+    bisection_xirr,
+    newton_xirr,
+    secant_xirr,
+)
+
+try:
+    import pyxirr
+
+    _pyxirr: Callable[..., float | None] | None = pyxirr.xirr
+    _PYXIRR_AVAILABLE = True
+except ImportError:
+    # Fallback to the pure-Python solvers if pyxirr is not available
+    _pyxirr = None
+    _PYXIRR_AVAILABLE = False
 
 
 def calculate_xirr(
@@ -21,7 +42,7 @@ def calculate_xirr(
         cashflows: List of (date, amount) tuples.
             - Negative amounts = cash outflows (investments/purchases)
             - Positive amounts = cash inflows (sales/dividends/final value)
-        max_iterations: Maximum iterations for Newton-Raphson method.
+        max_iterations: Maximum iterations for the secant method.
         tolerance: Convergence tolerance.
 
     Returns:
@@ -40,95 +61,117 @@ def calculate_xirr(
     if not cashflows or len(cashflows) < 2:
         return 0.0
 
-    # Filter out zero cash flows
-    cashflows = [(d, amt) for d, amt in cashflows if amt != 0]
-    if len(cashflows) < 2:
-        return 0.0
+    # Filter out zero cash flows and note which signs are present in one
+    # pass. Dates become ordinals so the sorted flows make a small hashable
+    # key for the memoized solver
+    has_negative = has_positive = False
+    flows = []
+    for d, amt in cashflows:
+        if amt == 0:
+            continue
+        if amt < 0:
+            has_negative = True
+        else:
+            has_positive = True
+        flows.append((d.toordinal(), float(amt)))
 
     # Check if there are both positive and negative cash flows
-    has_negative = any(amt < 0 for _, amt in cashflows)
-    has_positive = any(amt > 0 for _, amt in cashflows)
     if not has_negative or not has_positive:
         return 0.0
 
-    # Sort by date
-    cashflows = sorted(cashflows, key=lambda x: x[0])
-    min_date = cashflows[0][0]
-
-    # Calculate years from first date for each cash flow
-    def years_from_start(d: date) -> float:
-        return (d - min_date).days / 365.0
+    flows.sort()
+    return _calculate_xirr_cached(tuple(flows), max_iterations, tolerance)
 
-    years = [years_from_start(d) for d, _ in cashflows]
-    amounts = [amt for _, amt in cashflows]
 
-    def npv(rate: float) -> float:
-        """Calculate Net Present Value at given rate."""
-        if rate <= -1:
-            return float("inf")
-        return sum(amt / ((1 + rate) ** yr) for amt, yr in zip(amounts, years))
-
-    def npv_derivative(rate: float) -> float:
-        """Calculate derivative of NPV with respect to rate."""
-        if rate <= -1:
-            return float("inf")
-        return sum(
-            -yr * amt / ((1 + rate) ** (yr + 1)) for amt, yr in zip(amounts, years)
-        )
-
-    # Newton-Raphson method with initial guess of 10%
-    rate = 0.1
-
-    for _ in range(max_iterations):
-        npv_value = npv(rate)
-        npv_deriv = npv_derivative(rate)
-
-        if abs(npv_deriv) < 1e-10:
-            # Derivative too small, try bisection
-            break
-
-        new_rate = rate - npv_value / npv_deriv
+@lru_cache(maxsize=4096)
+def _calculate_xirr_cached(
+    cashflows: tuple[tuple[int, float], ...], max_iterations: int, tolerance: float
+) -> float:
+    """Solve XIRR for date-sorted (ordinal, amount) cash flows.
 
-        # Bound the rate to reasonable values
-        new_rate = max(-0.99, min(new_rate, 10.0))
+    Reports re-render the same cash flows (table and JSON output, repeated
+    runs in one session), so results are cached on the cash flow tuple.
+    """
+    first_day = cashflows[0][0]
+
+    if len(cashflows) == 2:
+        # One outflow and one inflow (e.g. a holding with no trades in the
+        # year): NPV = a0 + a1 / (1+r)**t has the closed-form root
+        # (1+r) = (-a1/a0)**(1/t), so no iteration is needed
+        (_, first_amount), (last_day, last_amount) = cashflows
+        days = last_day - first_day
+        if days > 0:
+            return _two_cashflow_rate(first_amount, last_amount, days / 365.0)
+
+    if _PYXIRR_AVAILABLE:
+        rate = _native_xirr(cashflows)
+        if rate is not None:
+            return rate * 100  # Convert to percentage
+
+    # Years from first date and amount for each cash flow, computed once
+    # and reused by every solver iteration
+    years = [(day - first_day) / 365.0 for day, _ in cashflows]
+    amounts = [amt for _, amt in cashflows]
 
-        if abs(new_rate - rate) < tolerance:
-            return new_rate * 100  # Convert to percentage
+    rate = secant_xirr(amounts, years, max_iterations, tolerance)
+    if rate is None:
+        # Secant can stall when cashflows change sign more than once
+        rate = newton_xirr(amounts, years, max_iterations, tolerance)
+    if rate is None:
+        # Fallback to bisection method if both iterative methods fail
+        rate = bisection_xirr(amounts, years, tolerance)
+    return rate * 100  # Convert to percentage
 
-        rate = new_rate
 
-    # Fallback to bisection method if Newton-Raphson fails
-    return _bisection_xirr(amounts, years, tolerance) * 100
+def _native_xirr(cashflows: tuple[tuple[int, float], ...]) -> float | None:
+    """Solve XIRR with pyxirr, or None to defer to the pure-Python solvers.
 
+    Roots outside [MIN_RATE, MAX_RATE] are rejected so results match the
+    pure-Python path regardless of which backend is installed.
+    """
+    if _pyxirr is None:
+        return None
+    dates = [date.fromordinal(day) for day, _ in cashflows]
+    amounts = [amt for _, amt in cashflows]
+    try:
+        rate = _pyxirr(dates, amounts, guess=0.1)
+    except Exception:  # pyxirr raises its own error types on bad input
+        return None
+    if rate is None or not MIN_RATE < rate < MAX_RATE:
+        return None
+    return float(rate)
 
-def _bisection_xirr(
-    amounts: list[float],
-    years: list[float],
-    tolerance: float = 1e-6,
-) -> float:
-    """Fallback bisection method for XIRR calculation."""
-    low, high = -0.99, 10.0
 
-    def npv(rate: float) -> float:
-        return sum(amt / ((1 + rate) ** yr) for amt, yr in zip(amounts, years))
+def _two_cashflow_rate(first_amount: float, last_amount: float, years: float) -> float:
+    """Get the XIRR percentage for two opposite-signed cash flows years apart.
 
-    # Check if solution exists in range
-    if npv(low) * npv(high) > 0:
+    Matches the iterative solvers: a root outside [MIN_RATE, MAX_RATE]
+    gives 0.0, as bisection does when the bracket holds no root.
+    """
+    try:
+        rate = math.exp(math.log(-last_amount / first_amount) / years) - 1
+    except OverflowError:
+        return 0.0
+    if not MIN_RATE < rate < MAX_RATE:
         return 0.0
+    return rate * 100  # Convert to percentage
 
-    for _ in range(100):
-        mid = (low + high) / 2
-        npv_mid = npv(mid)
 
-        if abs(npv_mid) < tolerance or (high - low) / 2 < tolerance:
-            return mid
+# Cash flow direction per transaction type: buys are outflows (negative),
+# sells and dividends are inflows (positive). Other types carry no cash
+_CASHFLOW_SIGN = {"BUY": -1.0, "SELL": 1.0, "DIVIDEND": 1.0}
 
-        if npv(low) * npv_mid < 0:
-            high = mid
-        else:
-            low = mid
 
-    return (low + high) / 2
+def _signed_cashflows(
+    transactions: Iterable[tuple[date, str, float]],
+) -> list[tuple[date, float]]:
+    """Turn (date, type, amount) transactions into signed cash flows."""
+    sign_of = _CASHFLOW_SIGN.get
+    return [
+        (tx_date, sign * amount)
+        for tx_date, tx_type, amount in transactions
+        if (sign := sign_of(tx_type)) is not None
+    ]
 
 
 def build_annual_cashflows(
@@ -136,7 +179,7 @@ def build_annual_cashflows(
     end_date: date,
     start_value: float,
     end_value: float,
-    transactions: list[tuple[date, str, float]],
+    transactions: Iterable[tuple[date, str, float]],
 ) -> list[tuple[date, float]]:
     """Build cash flow list for annual XIRR calculation.
 
@@ -145,26 +188,17 @@ def build_annual_cashflows(
         end_date: Year end date (for final portfolio value).
         start_value: Portfolio value at start of year.
         end_value: Portfolio value at end of year.
-        transactions: List of (date, type, amount) tuples.
+        transactions: Iterable of (date, type, amount) tuples.
             type: 'BUY', 'SELL', or 'DIVIDEND'
 
     Returns:
         List of (date, amount) tuples for XIRR calculation.
     """
-    cashflows: list[tuple[date, float]] = []
-
     # Start value as negative (virtual investment at year start)
-    if start_value > 0:
-        cashflows.append((start_date, -start_value))
+    cashflows = [(start_date, -start_value)] if start_value > 0 else []
 
     # Process transactions during the year
-    for tx_date, tx_type, amount in transactions:
-        if tx_type == "BUY":
-            # Buy = cash outflow (negative)
-            cashflows.append((tx_date, -amount))
-        elif tx_type in ("SELL", "DIVIDEND"):
-            # Sell/Dividend = cash inflow (positive)
-            cashflows.append((tx_date, amount))
+    cashflows += _signed_cashflows(transactions)
 
     # End value as positive (virtual liquidation at year end)
     if end_value > 0:
@@ -174,28 +208,22 @@ def build_annual_cashflows(
 
 
 def build_history_cashflows(
-    transactions: list[tuple[date, str, float]],
+    transactions: Iterable[tuple[date, str, float]],
     end_date: date,
     current_value: float,
 ) -> list[tuple[date, float]]:
     """Build cash flow list for history (all-time) XIRR calculation.
 
     Args:
-        transactions: List of (date, type, amount) tuples.
+        transactions: Iterable of (date, type, amount) tuples.
         end_date: Current date (for final portfolio value).
         current_value: Current portfolio value.
 
     Returns:
         List of (date, amount) tuples for XIRR calculation.
     """
-    cashflows: list[tuple[date, float]] = []
-
     # Process all transactions
-    for tx_date, tx_type, amount in transactions:
-        if tx_type == "BUY":
-            cashflows.append((tx_date, -amount))
-        elif tx_type in ("SELL", "DIVIDEND"):
-            cashflows.append((tx_date, amount))
+    cashflows = _signed_cashflows(transactions)
 
     # Current value as final cash inflow
     if current_value > 0:
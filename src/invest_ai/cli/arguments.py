@@ -1,10 +1,16 @@
 """CLI argument parsing and validation."""
 
 import argparse
+import os
+import stat
 import sys
-from pathlib import Path
+from datetime import datetime
 
-from invest_ai.models import InvestmentType
+# Year at import, refreshed only when a later year is asked for
+_CURRENT_YEAR = datetime.now().year
+
+# Parser built on first use and shared by later parse_arguments calls
+_PARSER: argparse.ArgumentParser | None = None
 
 
 def parse_arguments(args: list[str] | None = None) -> argparse.Namespace | None:
@@ -16,8 +22,6 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace | None:
     Returns:
         Parsed arguments, or None if help was shown (no arguments provided).
     """
-    parser = create_argument_parser()
-
     # Handle no arguments case - show help summary
     if args is not None and len(args) == 0:
         print_help_summary()
@@ -26,7 +30,7 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace | None:
         print_help_summary()
         return None
 
-    parsed = parser.parse_args(args)
+    parsed = _get_parser().parse_args(args)
 
     # Set default data path based on type if not provided
     if parsed.data is None and parsed.type:
@@ -35,8 +39,20 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace | None:
     return parsed
 
 
+def _get_parser() -> argparse.ArgumentParser:
+    """Get the shared argument parser, creating it on first use."""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = create_argument_parser()
+    return _PARSER
+
+
 def create_argument_parser() -> argparse.ArgumentParser:
     """Create and configure the argument parser."""
+    # Imported here so importing this module does not load the models
+    # (and pydantic) until a parser is actually needed
+    from invest_ai.models import InvestmentType
+
     parser = argparse.ArgumentParser(
         prog="invest-ai",
         description="Calculate investment profit and loss for Chinese stocks and mutual funds",
@@ -115,12 +131,14 @@ def validate_arguments(args: argparse.Namespace) -> bool:
     errors = []
     warnings = []
 
-    # Validate data file exists
-    data_path = Path(args.data)
-    if not data_path.exists():
+    # Validate data file exists, with a single stat call
+    try:
+        data_stat = os.stat(args.data)
+    except (FileNotFoundError, NotADirectoryError):
         errors.append(f"Data file does not exist: {args.data}")
-    elif not data_path.is_file():
-        errors.append(f"Data path is not a file: {args.data}")
+    else:
+        if not stat.S_ISREG(data_stat.st_mode):
+            errors.append(f"Data path is not a file: {args.data}")
 
     # Validate file extension
     if not args.data.lower().endswith((".yaml", ".yml")):
@@ -144,8 +162,10 @@ def validate_arguments(args: argparse.Namespace) -> bool:
 
     # Validate year range
     if args.year:
-        from datetime import datetime
-        current_year = datetime.now().year
+        current_year = _CURRENT_YEAR
+        if args.year > current_year:
+            # The process may have outlived the year it started in
+            current_year = datetime.now().year
         if args.year < 1990 or args.year > current_year:
             errors.append(f"Year must be between 1990 and {current_year}")
 
@@ -3,8 +3,8 @@
 import argparse
 import asyncio
 import sys
-from datetime import date
-from typing import cast
+from datetime import date, datetime
+from functools import cached_property
 
 from invest_ai.models import (
     AnnualResult,
@@ -18,12 +18,78 @@ from invest_ai.models import (
 from ..calculation.engine import CalculationEngine
 from ..config.settings import load_settings
 from ..market.price_fetcher import PriceFetcher
+from ..market.trading_days import get_year_end_trading_day, get_year_start_trading_day
 from ..reporting.reports import ReportGenerator
 from ..transaction.filter import TransactionFilter
 from ..transaction.loader import TransactionLoader
 from ..transaction.validator import TransactionValidator
 from .arguments import parse_arguments, print_help_summary, validate_arguments
 
+try:
+    import uvloop
+
+    _UVLOOP_AVAILABLE = True
+except ImportError:
+    # Fall back to the stdlib event loop
+    uvloop = None
+    _UVLOOP_AVAILABLE = False
+
+# Price source for a code by its leading digit; codes not listed get a
+# default price
+_PRICE_ROUTE_BY_PREFIX = {
+    "0": "stock",
+    "3": "stock",
+    "6": "stock",
+    "5": "fund",
+    "1": "fund",
+}
+
+# Plain-text result boxes keyed by (annual result, single code); r is the
+# AnnualResult or HistoryResult being shown
+_RESULT_TEMPLATES = {
+    (True, True): """
+┌─────────────────────────────────────┐
+│ {type} {code} - {r.year}
+├─────────────────────────────────────┤
+│ Initial Investment: ¥{r.start_value:,.2f}
+│ Current Value:     ¥{r.end_value:,.2f}
+│ Net Gain/Loss:     ¥{r.net_gain:,.2f}
+│ XIRR (Annual):       {r.return_rate:.2f}%
+│ Dividends:         ¥{r.dividends:,.2f}
+└─────────────────────────────────────┘""",
+    (True, False): """
+┌─────────────────────────────────────┐
+│ PORTFOLIO - {r.year}
+├─────────────────────────────────────┤
+│ Start Value:       ¥{r.start_value:,.2f}
+│ End Value:         ¥{r.end_value:,.2f}
+│ Dividends:         ¥{r.dividends:,.2f}
+│ Capital Gain:      ¥{r.capital_gain:,.2f}
+│ Total Gain/Loss:   ¥{r.net_gain:,.2f}
+│ XIRR (Annual):       {r.return_rate:.2f}%
+└─────────────────────────────────────┘""",
+    (False, True): """
+┌─────────────────────────────────────┐
+│ {type} {code} - History
+│ {date_range}
+├─────────────────────────────────────┤
+│ Total Invested:    ¥{r.total_invested:,.2f}
+│ Current Value:     ¥{r.current_value:,.2f}
+│ Total P&L:         ¥{r.total_gain:,.2f}
+│ XIRR (Annual):       {r.return_rate:.2f}%
+└─────────────────────────────────────┘""",
+    (False, False): """
+┌─────────────────────────────────────┐
+│ PORTFOLIO HISTORY
+│ {date_range}
+├─────────────────────────────────────┤
+│ Total Invested:    ¥{r.total_invested:,.2f}
+│ Current Value:     ¥{r.current_value:,.2f}
+│ Total P&L:         ¥{r.total_gain:,.2f}
+│ XIRR (Annual):       {r.return_rate:.2f}%
+└─────────────────────────────────────┘""",
+}
+
 
 class CLIController:
     """Main CLI controller."""
@@ -34,9 +100,43 @@ class CLIController:
         self.loader = TransactionLoader()
         self.validator = TransactionValidator()
         self.filter = TransactionFilter()
-        self.engine = CalculationEngine()
-        self.reporter = ReportGenerator()
-        self.price_fetcher = PriceFetcher()
+
+    # The collaborators below are built on first use, so help output and
+    # argument errors skip API client setup
+
+    @cached_property
+    def engine(self) -> CalculationEngine:
+        """Get the calculation engine."""
+        return CalculationEngine()
+
+    @cached_property
+    def reporter(self) -> ReportGenerator:
+        """Get the report generator."""
+        return ReportGenerator()
+
+    @cached_property
+    def price_fetcher(self) -> PriceFetcher:
+        """Get the price fetcher."""
+        return PriceFetcher()
+
+    def close(self) -> None:
+        """Close the price fetcher's pooled sessions, if it was built."""
+        price_fetcher = self.__dict__.get("price_fetcher")
+        if price_fetcher is not None:
+            price_fetcher.close()
+
+    async def __aenter__(self) -> "CLIController":
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: object,
+    ) -> None:
+        """Async context manager exit."""
+        self.close()
 
     async def run(self, args: list[str] | None = None) -> int:
         """Run the CLI application."""
@@ -75,25 +175,21 @@ class CLIController:
                 print(f"Error: {e}", file=sys.stderr)
             return 1
 
-    def _get_arg(self, args: argparse.Namespace | dict, key: str, default=None):
-        """Get argument value from either dict or Namespace."""
-        if isinstance(args, dict):
-            return args.get(key, default)
-        return getattr(args, key, default)
-
     async def execute_calculation(
         self, args: argparse.Namespace | dict
     ) -> AnnualResult | HistoryResult | None:
         """Execute the calculation based on arguments."""
         try:
-            # Extract arguments
-            data_path = self._get_arg(args, "data")
-            type_value = self._get_arg(args, "type")
-            transactions_provided = self._get_arg(args, "transactions")
-            mock_prices = self._get_arg(args, "mock_prices")
-            verbose = self._get_arg(args, "verbose")
-            code_value = self._get_arg(args, "code")
-            year_value = self._get_arg(args, "year")
+            # Extract arguments, normalizing to a mapping once rather than
+            # dispatching on the argument type for every key
+            params = args if isinstance(args, dict) else vars(args)
+            data_path = params.get("data")
+            type_value = params.get("type")
+            transactions_provided = params.get("transactions")
+            mock_prices = params.get("mock_prices")
+            verbose = params.get("verbose")
+            code_value = params.get("code")
+            year_value = params.get("year")
 
             # Convert string year to int if needed
             if isinstance(year_value, str):
@@ -167,13 +263,18 @@ class CLIController:
                 return annual_result
             elif year_value and not code_value:
                 # All investments, specific year
-                # Get all codes that have transactions
-                all_codes = set(pre_year_transactions.get_codes()) | set(filtered_transactions.get_codes())
                 prices_for_annual = mock_prices or {}
-                if not prices_for_annual and all_codes:
-                    prices_for_annual = await self._fetch_annual_prices(
-                        list(all_codes), year_value, investment_type
+                if not prices_for_annual:
+                    # Get all codes that have transactions; get_codes()
+                    # already returns sets, so union them without copying
+                    all_codes = (
+                        pre_year_transactions.get_codes()
+                        | filtered_transactions.get_codes()
                     )
+                    if all_codes:
+                        prices_for_annual = await self._fetch_annual_prices(
+                            list(all_codes), year_value, investment_type
+                        )
                 annual_result = await self.engine.calculate_portfolio_annual_returns(
                     pre_year_transactions, filtered_transactions, year_value, prices_for_annual
                 )
@@ -218,72 +319,28 @@ class CLIController:
         """Display calculation results."""
         try:
             if args.format == "json":
-                # Convert result to dict for JSON format
-                result_dict = (
-                    result.model_dump()
-                    if hasattr(result, "model_dump")
-                    else dict(result)
-                )
-                output = await self.reporter.format_json_report(result_dict)
-            else:
-                if args.year:
-                    # This should be an AnnualResult
-                    annual_result = cast(AnnualResult, result)
-                    # Simple clean output
-                    if args.code:
-                        output = f"""
-┌─────────────────────────────────────┐
-│ {args.type.upper()} {args.code} - {annual_result.year}
-├─────────────────────────────────────┤
-│ Initial Investment: ¥{annual_result.start_value:,.2f}
-│ Current Value:     ¥{annual_result.end_value:,.2f}
-│ Net Gain/Loss:     ¥{annual_result.net_gain:,.2f}
-│ XIRR (Annual):       {annual_result.return_rate:.2f}%
-│ Dividends:         ¥{annual_result.dividends:,.2f}
-└─────────────────────────────────────┘"""
-                    else:
-                        output = f"""
-┌─────────────────────────────────────┐
-│ PORTFOLIO - {annual_result.year}
-├─────────────────────────────────────┤
-│ Start Value:       ¥{annual_result.start_value:,.2f}
-│ End Value:         ¥{annual_result.end_value:,.2f}
-│ Dividends:         ¥{annual_result.dividends:,.2f}
-│ Capital Gain:      ¥{annual_result.capital_gain:,.2f}
-│ Total Gain/Loss:   ¥{annual_result.net_gain:,.2f}
-│ XIRR (Annual):       {annual_result.return_rate:.2f}%
-└─────────────────────────────────────┘"""
+                if hasattr(result, "model_dump_json"):
+                    # Serialize straight from the model in pydantic-core,
+                    # without building an intermediate dict
+                    output = result.model_dump_json(indent=2)
                 else:
-                    # This should be a HistoryResult
-                    history_result = cast(HistoryResult, result)
-                    # Simple clean history output
+                    output = await self.reporter.format_json_report(dict(result))
+            else:
+                # AnnualResult when a year was given, otherwise HistoryResult
+                code = args.code
+                date_range = ""
+                if isinstance(result, HistoryResult):
                     # Build date range string
-                    start_date = history_result.first_investment.strftime("%Y-%m-%d") if history_result.first_investment else "N/A"
-                    end_date = date.today().strftime("%Y-%m-%d")
+                    start_date = result.first_investment.isoformat() if result.first_investment else "N/A"
+                    end_date = date.today().isoformat()
                     date_range = f"{start_date} ~ {end_date}"
-                    
-                    if args.code:
-                        output = f"""
-┌─────────────────────────────────────┐
-│ {args.type.upper()} {args.code} - History
-│ {date_range}
-├─────────────────────────────────────┤
-│ Total Invested:    ¥{history_result.total_invested:,.2f}
-│ Current Value:     ¥{history_result.current_value:,.2f}
-│ Total P&L:         ¥{history_result.total_gain:,.2f}
-│ XIRR (Annual):       {history_result.return_rate:.2f}%
-└─────────────────────────────────────┘"""
-                    else:
-                        output = f"""
-┌─────────────────────────────────────┐
-│ PORTFOLIO HISTORY
-│ {date_range}
-├─────────────────────────────────────┤
-│ Total Invested:    ¥{history_result.total_invested:,.2f}
-│ Current Value:     ¥{history_result.current_value:,.2f}
-│ Total P&L:         ¥{history_result.total_gain:,.2f}
-│ XIRR (Annual):       {history_result.return_rate:.2f}%
-└─────────────────────────────────────┘"""
+
+                output = _RESULT_TEMPLATES[bool(args.year), bool(code)].format(
+                    r=result,
+                    type=args.type.upper(),
+                    code=code,
+                    date_range=date_range,
+                )
 
             print(output)
 
@@ -349,9 +406,6 @@ class CLIController:
             Dictionary with 'year_start' and 'year_end' keys, each containing
             a dict mapping code to PriceData
         """
-        from datetime import datetime
-        from ..market.trading_days import get_year_start_trading_day, get_year_end_trading_day
-        
         if not codes:
             return {"year_start": {}, "year_end": {}}
         
@@ -381,8 +435,6 @@ class CLIController:
                 # Fund: Use parallel requests (EastMoney has no strict rate limit)
                 # Note: East Money API doesn't enforce strict rate limits, so we can
                 # safely fetch prices in parallel for better performance
-                import asyncio
-
                 async def fetch_fund_price(code: str, target_date: date, label: str) -> tuple[str, str, PriceData | None]:
                     try:
                         nav_data = await self.price_fetcher.eastmoney_client.fetch_fund_nav(code, target_date)
@@ -402,30 +454,63 @@ class CLIController:
                     tasks.append(fetch_fund_price(code, year_start_date, "year_start"))
                     tasks.append(fetch_fund_price(code, year_end_date, "year_end"))
                 
-                results = await asyncio.gather(*tasks)
-                for code, label, price_data in results:
+                # File each price as soon as its request finishes rather than
+                # waiting on the slowest one
+                for next_result in asyncio.as_completed(tasks):
+                    code, label, price_data = await next_result
                     if price_data:
                         if label == "year_start":
                             year_start_prices[code] = price_data
                         else:
                             year_end_prices[code] = price_data
             else:
-                # Stock: Sequential requests (Tushare has rate limit)
+                # Stock: Concurrent requests gated by Tushare's rate limit
                 # Note: Tushare API enforces strict rate limits (200 calls/day free tier),
-                # so we must fetch prices sequentially to avoid hitting the limit
-                assert self.price_fetcher.tushare_client is not None
-                for code in codes:
+                # so in-flight requests are capped at the per-second allowance
+                tushare_client = self.price_fetcher.tushare_client
+                assert tushare_client is not None
+                rate_limit = tushare_client.config.tushare.rate_limit_per_minute
+                semaphore = asyncio.Semaphore(max(1, rate_limit // 60))
+
+                async def fetch_stock_price(code: str, target_date: date, label: str) -> tuple[str, str, PriceData | None]:
+                    async with semaphore:
+                        try:
+                            price_data = await tushare_client.fetch_stock_price(code, target_date)
+                            return code, label, price_data
+                        except Exception as e:
+                            print(f"Warning: Failed to fetch {label.replace('_', '-')} price for {code}: {e}", file=sys.stderr)
+                            return code, label, None
+
+                # One bulk daily request per date covers most codes; only
+                # codes it has no row for go through the per-code fallback
+                for target_date, prices in (
+                    (year_start_date, year_start_prices),
+                    (year_end_date, year_end_prices),
+                ):
                     try:
-                        price_data = await self.price_fetcher.tushare_client.fetch_stock_price(code, year_start_date)
-                        year_start_prices[code] = price_data
-                    except Exception as e:
-                        print(f"Warning: Failed to fetch year-start price for {code}: {e}", file=sys.stderr)
-                    
-                    try:
-                        price_data = await self.price_fetcher.tushare_client.fetch_stock_price(code, year_end_date)
-                        year_end_prices[code] = price_data
+                        prices.update(
+                            await tushare_client.fetch_stock_prices_bulk(codes, target_date)
+                        )
                     except Exception as e:
-                        print(f"Warning: Failed to fetch year-end price for {code}: {e}", file=sys.stderr)
+                        print(f"Warning: Bulk price request for {target_date} failed: {e}", file=sys.stderr)
+
+                results = await asyncio.gather(
+                    *(
+                        fetch_stock_price(code, target_date, label)
+                        for code in codes
+                        for target_date, label, prices in (
+                            (year_start_date, "year_start", year_start_prices),
+                            (year_end_date, "year_end", year_end_prices),
+                        )
+                        if code not in prices
+                    )
+                )
+                for code, label, price_data in results:
+                    if price_data:
+                        if label == "year_start":
+                            year_start_prices[code] = price_data
+                        else:
+                            year_end_prices[code] = price_data
             
             return {
                 "year_start": year_start_prices,
@@ -438,67 +523,70 @@ class CLIController:
 
     def _get_current_prices(self, codes: list[str]) -> dict[str, float]:
         """Get current market prices for given investment codes."""
-        import asyncio
-        import sys
-
-        from ..market.price_fetcher import PriceFetcher
-
-        async def fetch_prices():
-            fetcher = PriceFetcher()
-            prices = {}
-            for code in codes:
-                try:
-                    if (
-                        code.startswith("0")
-                        or code.startswith("3")
-                        or code.startswith("6")
-                    ):
-                        # Mainland stock
-                        client = fetcher.tushare_client
-                        if client:
-                            price_data = await client.fetch_current_price(code)
-                            prices[code] = price_data.close if price_data else 100.0
-                    elif (
-                        code.startswith("5") or len(code) == 6 and code.startswith("1")
-                    ):
-                        # Fund
-                        client = fetcher.eastmoney_client
-                        if client:
-                            nav_data = await client.fetch_fund_nav(code)
-                            prices[code] = nav_data.nav if nav_data else 1.0
-                    else:
-                        # Other/International stocks - use default prices
-                        prices[code] = 100.0
-                except Exception as err:
-                    # Default price for failed API calls
-                    print(
-                        f"Warning: Failed to fetch price for {code}: {err}",
-                        file=sys.stderr,
-                    )
-                    prices[code] = 100.0
-            return prices
+        today = date.today()
+        tushare_client = self.price_fetcher.tushare_client
+        eastmoney_client = self.price_fetcher.eastmoney_client
+
+        async def fetch_price(code: str) -> float | None:
+            route = _PRICE_ROUTE_BY_PREFIX.get(code[:1])
+            if route == "fund" and code[:1] == "1" and len(code) != 6:
+                # Only 6-digit codes starting with 1 are funds
+                route = None
+            try:
+                if route == "stock":
+                    # Mainland stock
+                    if not tushare_client:
+                        return None
+                    price_data = await tushare_client.fetch_stock_price(code, today)
+                    return price_data.price_value
+                if route == "fund":
+                    nav_data = await eastmoney_client.fetch_fund_nav(code, today)
+                    return nav_data.nav
+                # Other/International stocks - use default prices
+                return 100.0
+            except Exception as err:
+                # Default price for failed API calls
+                print(
+                    f"Warning: Failed to fetch price for {code}: {err}",
+                    file=sys.stderr,
+                )
+                return 100.0
+
+        async def fetch_prices() -> dict[str, float]:
+            # Reuse the controller's clients and their pooled sessions, and
+            # let requests for different codes overlap
+            results = await asyncio.gather(*(fetch_price(code) for code in codes))
+            return {
+                code: price
+                for code, price in zip(codes, results)
+                if price is not None
+            }
+
+        return asyncio.run(fetch_prices())
 
-        # Run the async function
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
 
-        return loop.run_until_complete(fetch_prices())
+async def _run_controller(controller: CLIController) -> int:
+    """Run the controller, closing its HTTP sessions afterwards."""
+    async with controller:
+        return await controller.run()
 
 
 def main() -> int:
     """Main entry point."""
-    controller = CLIController()
-
     # Check for special cases first
     if len(sys.argv) == 1:
         print_help_summary()
         return 0
 
-    # Run the application
-    return asyncio.run(controller.run())
+    controller = CLIController()
+
+    # Run the application, on uvloop when it is installed; the work is
+    # almost entirely concurrent HTTP requests
+    loop_factory = None
+    if _UVLOOP_AVAILABLE and sys.platform != "win32":
+        loop_factory = uvloop.new_event_loop
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(_run_controller(controller))
 
 
 if __name__ == "__main__":
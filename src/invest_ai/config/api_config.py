@@ -1,7 +1,12 @@
 """API configuration classes."""
 
+import random
+
 from pydantic import BaseModel, Field
 
+# Upper bound for a single retry wait, regardless of attempt number
+MAX_RETRY_DELAY = 30.0
+
 
 class TushareConfig(BaseModel):
     """Tushare API configuration."""
@@ -16,6 +21,9 @@ class TushareConfig(BaseModel):
         default=1.0, description="Delay between retries in seconds"
     )
     rate_limit_per_minute: int = Field(default=60, description="Rate limit per minute")
+    max_connections: int = Field(
+        default=10, description="Concurrent requests and pooled connections"
+    )
     daily_limit: int = Field(
         default=200, description="Daily API call limit (free tier)"
     )
@@ -37,6 +45,9 @@ class EastMoneyConfig(BaseModel):
     retry_delay: float = Field(
         default=1.0, description="Delay between retries in seconds"
     )
+    max_connections: int = Field(
+        default=10, description="Concurrent requests and pooled connections"
+    )
     referer: str = Field(
         default="http://fund.eastmoney.com", description="Referer header for requests"
     )
@@ -56,6 +67,12 @@ class APIConfig(BaseModel):
 
     tushare: TushareConfig = Field(default_factory=TushareConfig)
     eastmoney: EastMoneyConfig = Field(default_factory=EastMoneyConfig)
+    cache_dir: str | None = Field(
+        default=None, description="On-disk price cache directory (None disables)"
+    )
+    cache_ttl: float = Field(
+        default=300, description="Seconds recent prices stay cached"
+    )
 
     @property
     def stock_client_available(self) -> bool:
@@ -105,6 +122,18 @@ class APIConfig(BaseModel):
         return issues
 
 
+def backoff_delay(
+    retry_delay: float, attempt: int, max_delay: float = MAX_RETRY_DELAY
+) -> float:
+    """Exponential backoff with jitter for the given retry attempt (0-based).
+
+    Jitter spreads concurrent retries apart so parallel requests that fail
+    together do not all hit the API again at the same instant.
+    """
+    # Cap after jittering so max_delay really bounds every wait
+    return min(max_delay, retry_delay * 2.0**attempt * random.uniform(0.5, 1.5))
+
+
 def create_api_config() -> APIConfig:
     """Create API configuration from settings."""
     from .settings import load_settings
@@ -120,4 +149,6 @@ def create_api_config() -> APIConfig:
     return APIConfig(
         tushare=tushare_config,
         eastmoney=eastmoney_config,
+        cache_dir=settings.price_cache_dir if settings.cache_enabled else None,
+        cache_ttl=settings.cache_ttl,
     )
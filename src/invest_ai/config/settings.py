@@ -1,9 +1,10 @@
 """Configuration settings management."""
 
+from functools import lru_cache
 from typing import Any
 
 from pydantic import Field
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -17,7 +18,11 @@ class Settings(BaseSettings):
     # Data settings
     default_data_dir: str = Field(default=".")
     cache_enabled: bool = Field(default=True)
-    cache_ttl: int = Field(default=3600)  # 1 hour
+    cache_ttl: int = Field(
+        default=300,
+        description="Seconds quotes for recent, not-yet-final dates stay cached",
+    )
+    price_cache_dir: str = Field(default="~/.cache/invest-ai/prices")
 
     # API settings
     tushare_token: str | None = Field(default=None)
@@ -48,17 +53,23 @@ class Settings(BaseSettings):
         """Check if we should use Tushare API."""
         return self.tushare_configured
 
-    class Config:
-        """Pydantic configuration."""
-
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
-        extra = "ignore"
+    # Frozen: load_settings() hands one shared instance to every caller
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore",
+        frozen=True,
+    )
 
 
+@lru_cache(maxsize=1)
 def load_settings() -> Settings:
-    """Load application settings."""
+    """Load application settings.
+
+    The environment and .env file are read once per process; the clients
+    and CLI controller share the result.
+    """
     return Settings()
 
 
@@ -0,0 +1,106 @@
+"""Persistent on-disk cache for price and NAV lookups."""
+
+import hashlib
+import json
+import math
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+# Quotes for the last day or so may not be published or final yet. Clients
+# pass Settings.cache_ttl, whose default matches this.
+RECENT_TTL_SECONDS = 300
+
+
+class FileCache:
+    """JSON-file-per-key cache for price lookups keyed by (code, date, source).
+
+    Each entry's expiry is fixed when it is written. A value for a date
+    before yesterday that is that date's own quote can never change, so it
+    is kept on disk for good. Anything else (today's or yesterday's quote,
+    which may not be published or final yet, or a fallback taken from an
+    earlier day) expires after recent_ttl seconds, and entries for today or
+    yesterday are kept in memory only. Entries read or written are also kept
+    in memory so repeat lookups in one process skip the file.
+    """
+
+    def __init__(
+        self, cache_dir: str | Path, recent_ttl: float = RECENT_TTL_SECONDS
+    ):
+        """Initialize the cache rooted at cache_dir (created lazily)."""
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.recent_ttl = recent_ttl
+        # (code, date, source) -> (expires_at, value)
+        self._memory: dict[tuple[str, date, str], tuple[float, dict[str, Any]]] = {}
+
+    def _path(self, code: str, date: date, source: str) -> Path:
+        """Get the file path for a cache key."""
+        key = hashlib.md5(f"{source}:{code}:{date.isoformat()}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, code: str, date: date, source: str) -> dict[str, Any] | None:
+        """Get a cached value, or None if missing, unreadable or expired."""
+        key = (code, date, source)
+        entry = self._memory.get(key)
+        if entry is None:
+            try:
+                with self._path(code, date, source).open(encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                return None
+            value = stored.get("value")
+            # Files without a write-time expiry predate it and may hold a
+            # quote that was not final yet; treat them as misses
+            if value is None or "expires_at" not in stored:
+                return None
+            expires_at = stored["expires_at"]
+            entry = (math.inf if expires_at is None else expires_at, value)
+            self._memory[key] = entry
+
+        expires_at, value = entry
+        if time.time() >= expires_at:
+            del self._memory[key]
+            return None
+        return value
+
+    def set(
+        self,
+        code: str,
+        target_date: date,
+        source: str,
+        value: dict[str, Any],
+        value_date: date | None = None,
+    ) -> None:
+        """Cache a JSON-serializable value; failures are ignored.
+
+        value_date is the date the value actually belongs to, when a lookup
+        fell back to an earlier day; it defaults to target_date.
+        """
+        final = target_date < date.today() - timedelta(days=1)
+        if final and (value_date is None or value_date == target_date):
+            expires_at = math.inf
+        else:
+            expires_at = time.time() + self.recent_ttl
+        self._memory[(code, target_date, source)] = (expires_at, value)
+
+        if not final:
+            # Today's and yesterday's quotes may still change
+            return
+
+        path = self._path(code, target_date, source)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        stored = {
+            "expires_at": None if expires_at == math.inf else expires_at,
+            "value": value,
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(stored, f)
+            # Atomic rename so concurrent readers never see a partial file
+            os.replace(tmp_path, path)
+        except OSError:
+            # The cache is an optimization; never fail a lookup because of it
+            pass
@@ -6,8 +6,50 @@ from datetime import date, timedelta
 import requests
 
 from invest_ai.config import create_api_config
+from invest_ai.config.api_config import MAX_RETRY_DELAY, backoff_delay
 from invest_ai.models import NavData, PriceData
 
+from .file_cache import FileCache
+from .models import MarketDataSummary
+from .trading_days import get_trading_days
+
+# Rows per /f10/lsjz page. A range request covers at most this many calendar
+# days, so one page always holds every NAV published in it.
+_NAV_RANGE_DAYS = 20
+
+
+def _retry_after(error: requests.exceptions.RequestException) -> float | None:
+    """Get the server-requested wait from a 429/503 response, if any."""
+    response = getattr(error, "response", None)
+    if response is None or response.status_code not in (429, 503):
+        return None
+    try:
+        return min(MAX_RETRY_DELAY, max(0.0, float(response.headers["Retry-After"])))
+    except (KeyError, TypeError, ValueError):
+        # Missing, or an HTTP date rather than seconds
+        return None
+
+
+def _nav_to_price(nav_data: NavData) -> PriceData:
+    """Convert NavData to PriceData, using the NAV as the price."""
+    return PriceData(
+        code=nav_data.code,
+        price_date=nav_data.nav_date,
+        price_value=nav_data.nav,
+        source="eastmoney",
+    )
+
+
+def _group_nearby_dates(dates: list[date]) -> list[list[date]]:
+    """Split sorted dates into runs spanning at most _NAV_RANGE_DAYS."""
+    groups: list[list[date]] = []
+    for day in dates:
+        if groups and (day - groups[-1][0]).days < _NAV_RANGE_DAYS:
+            groups[-1].append(day)
+        else:
+            groups.append([day])
+    return groups
+
 
 class EastMoneyClient:
     """East Money API client for Chinese mutual fund NAV data."""
@@ -16,175 +58,294 @@ class EastMoneyClient:
         """Initialize the East Money client."""
         self.config = create_api_config()
         self.session = requests.Session()
+        # Requests run in worker threads (see _make_api_request); keep one
+        # pooled keep-alive connection per concurrent request so parallel
+        # NAV fetches reuse sockets instead of reconnecting
+        pool_size = self.config.eastmoney.max_connections
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Resolved once instead of rebuilt for every request. East Money
+        # requires both date filtering AND pagination on /f10/lsjz.
+        self._headers = self.config.get_headers("eastmoney")
+        self._nav_url = (
+            f"{self.config.eastmoney.base_url}/f10/lsjz"
+            "?fundCode={code}&beginDate={begin}&endDate={end}"
+            "&pageIndex=1&pageSize={page_size}"
+        )
+
+        # URL -> request currently being fetched
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self.nav_cache = (
+            FileCache(self.config.cache_dir, self.config.cache_ttl)
+            if self.config.cache_dir
+            else None
+        )
 
     async def fetch_fund_nav(self, code: str, target_date: date) -> NavData:
         """Fetch fund NAV for a specific code and date."""
-        from .trading_days import TradingDaysChina
-        
+        try:
+            nav_result = await self._try_fetch_fund_nav(code, target_date)
+            if nav_result is None:
+                raise ValueError(f"No NAV data found for fund {code} on {target_date}")
+        except Exception as e:
+            raise RuntimeError(
+                f"Error fetching fund NAV for {code} on {target_date}: {e}"
+            ) from e
+        return nav_result
+
+    async def _try_fetch_fund_nav(self, code: str, target_date: date) -> NavData | None:
+        """Fetch fund NAV for a specific code and date, or None if none is published.
+
+        A missing NAV is expected for many dates, so batch callers get None
+        instead of an exception; request failures and malformed data still
+        raise.
+        """
+        if self.nav_cache:
+            cached = self.nav_cache.get(code, target_date, "eastmoney")
+            if cached:
+                return NavData.model_validate(cached)
+
         # Adjust to nearest trading day to avoid unnecessary API calls
-        calendar = TradingDaysChina()
+        calendar = get_trading_days()
         trading_date = target_date
         if not calendar.is_trading_day(target_date):
             trading_date = calendar.get_previous_trading_day(target_date, max_days_back=10)
-        
-        # Format parameters according to East Money API requirements
-        fund_code = code.zfill(6)
-        begin_date = trading_date.strftime("%Y-%m-%d")
-        end_date = trading_date.strftime("%Y-%m-%d")
 
-        # East Money requires both date filtering AND pagination
-        url = (
-            f"{self.config.eastmoney.base_url}/f10/lsjz"
-            f"?fundCode={fund_code}"
-            f"&beginDate={begin_date}"
-            f"&endDate={end_date}"
-            f"&pageIndex=1"
-            f"&pageSize=1"
+        fund_code = code.zfill(6)
+        url = self._nav_url.format(
+            code=fund_code, begin=trading_date, end=trading_date, page_size=1
         )
 
-        headers = self.config.get_headers("eastmoney")
-
-        try:
-            response = await self._make_api_request(url, headers)
-
-            if not response:
-                raise ValueError(f"No data found for fund {code} on {target_date}")
-
-            # Parse JSON response directly (no callback wrapper)
-            data = response
-
-            # Check if data is valid
-            if not data or "Data" not in data or not data["Data"]:
-                raise ValueError(f"No NAV data found for fund {code} on {target_date}")
-
-            nav_data = data["Data"]
-            
-            # Handle different response formats
-            # Format 1: Data is a dict with LSJZList containing the items
-            # Format 2: Data is a direct list of items
-            items = None
-            if isinstance(nav_data, dict) and "LSJZList" in nav_data:
-                items = nav_data["LSJZList"]
-            elif isinstance(nav_data, list):
-                items = nav_data
-            
-            if items and len(items) > 0:
-                item = items[0]
-
-                # Parse NAV fields
-                nav_value = float(item.get("DWJZ", "0"))  # 单位净值 (unit NAV)
-                accumulated_nav = float(
-                    item.get("LJJZ", "0")
-                )  # 累计净值 (accumulated NAV)
-
-                if nav_value <= 0:
-                    raise ValueError(f"Invalid NAV data for fund {code}: {item}")
-
-                return NavData(
-                    code=fund_code,
-                    nav_date=trading_date,
-                    nav=nav_value,
-                    accumulated_nav=accumulated_nav if accumulated_nav > 0 else None,
-                )
-            else:
-                raise ValueError(f"Unexpected response format: {data}")
+        # Parse JSON response directly (no callback wrapper)
+        data = await self._make_api_request(url, self._headers)
+
+        # Check if data is valid
+        if not data or not data.get("Data"):
+            return None
+
+        nav_data = data["Data"]
+
+        # Handle different response formats
+        # Format 1: Data is a dict with LSJZList containing the items
+        # Format 2: Data is a direct list of items
+        if isinstance(nav_data, dict) and "LSJZList" in nav_data:
+            items = nav_data["LSJZList"]
+        elif isinstance(nav_data, list):
+            items = nav_data
+        else:
+            raise ValueError(f"Unexpected response format: {data}")
+
+        if not items:
+            return None
+        item = items[0]
+
+        # Parse NAV fields
+        nav_value = float(item.get("DWJZ", "0"))  # 单位净值 (unit NAV)
+        accumulated_nav = float(item.get("LJJZ", "0"))  # 累计净值 (accumulated NAV)
+
+        if nav_value <= 0:
+            raise ValueError(f"Invalid NAV data for fund {code}: {item}")
+
+        nav_result = NavData(
+            code=fund_code,
+            nav_date=trading_date,
+            nav=nav_value,
+            accumulated_nav=accumulated_nav if accumulated_nav > 0 else None,
+        )
+        if self.nav_cache:
+            self.nav_cache.set(
+                code,
+                target_date,
+                "eastmoney",
+                nav_result.model_dump(mode="json"),
+                value_date=trading_date,
+            )
+        return nav_result
 
-        except Exception as e:
-            raise RuntimeError(
-                f"Error fetching fund NAV for {code} on {target_date}: {e}"
-            ) from e
+    async def fetch_current_navs(
+        self, codes: list[str], summary: MarketDataSummary | None = None
+    ) -> dict[str, NavData]:
+        """Fetch current NAVs for multiple fund codes.
 
-    async def fetch_current_navs(self, codes: list[str]) -> dict[str, NavData]:
-        """Fetch current NAVs for multiple fund codes."""
+        Each code fetched or failed is recorded in summary, if given.
+        """
         results: dict[str, NavData] = {}
 
         # Process in parallel with limited concurrency
-        semaphore = asyncio.Semaphore(10)  # Limit concurrent requests
+        semaphore = asyncio.Semaphore(self.config.eastmoney.max_connections)
 
-        async def fetch_single(code: str) -> tuple[str, NavData | None]:
+        async def fetch_single(code: str) -> NavData | None:
             async with semaphore:
                 try:
                     # Get NAV for today (or most recent trading day)
-                    today = date.today()
-                    nav_data = await self.fetch_fund_nav(code, today)
-                    return code, nav_data
+                    nav_data = await self._try_fetch_fund_nav(code, date.today())
                 except Exception as e:
                     print(f"Warning: Failed to fetch NAV for {code}: {e}")
-                    return code, None
+                    return None
+                if nav_data is None:
+                    print(f"Warning: No NAV data found for {code}")
+                return nav_data
 
-        tasks = [fetch_single(code) for code in codes]
-        completed = await asyncio.gather(*tasks, return_exceptions=True)
+        completed = await asyncio.gather(
+            *(fetch_single(code) for code in codes), return_exceptions=True
+        )
 
-        for result in completed:
-            if isinstance(result, tuple):
-                code, nav_data = result
-                if nav_data:
-                    results[code] = nav_data
+        # gather keeps input order, so results line up with codes
+        for code, nav_data in zip(codes, completed):
+            if isinstance(nav_data, NavData):
+                results[code] = nav_data
+                if summary:
+                    summary.add_success("eastmoney")
+            elif summary:
+                summary.add_failure()
 
         return results
 
+    async def _fetch_nav_range(
+        self, code: str, begin: date, end: date
+    ) -> dict[date, NavData]:
+        """Fetch every NAV published between two dates in one request.
+
+        Returns:
+            Dictionary mapping NAV date to NavData; empty if the request fails
+        """
+        fund_code = code.zfill(6)
+        url = self._nav_url.format(
+            code=fund_code, begin=begin, end=end, page_size=_NAV_RANGE_DAYS
+        )
+
+        try:
+            response = await self._make_api_request(url, self._headers)
+        except Exception:
+            return {}
+
+        nav_data = response.get("Data") if response else None
+        items = nav_data.get("LSJZList") if isinstance(nav_data, dict) else nav_data
+        if not isinstance(items, list):
+            return {}
+
+        navs: dict[date, NavData] = {}
+        for item in items:
+            try:
+                nav_date = date.fromisoformat(item["FSRQ"])
+                nav_value = float(item.get("DWJZ") or 0)
+                accumulated_nav = float(item.get("LJJZ") or 0)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if nav_value > 0:
+                navs[nav_date] = NavData(
+                    code=fund_code,
+                    nav_date=nav_date,
+                    nav=nav_value,
+                    accumulated_nav=accumulated_nav if accumulated_nav > 0 else None,
+                )
+        return navs
+
     async def fetch_historical_navs(
         self, codes: list[str], dates: list[date]
     ) -> dict[str, list[NavData]]:
-        """Fetch historical NAVs for multiple codes and dates."""
-        results = {}
+        """Fetch historical NAVs for multiple codes and dates.
 
-        for code in codes:
-            code_results = []
-            for target_date in dates:
-                try:
-                    nav_data = await self.fetch_fund_nav(code, target_date)
-                    code_results.append(nav_data)
-                except Exception as e:
-                    print(
-                        f"Warning: Failed to fetch historical NAV for {code} on {target_date}: {e}"
+        Codes are fetched concurrently, up to the connection pool size.
+        """
+        semaphore = asyncio.Semaphore(self.config.eastmoney.max_connections)
+
+        async def fetch_single(code: str) -> list[NavData]:
+            async with semaphore:
+                return await self._fetch_code_navs(code, dates)
+
+        completed = await asyncio.gather(*(fetch_single(code) for code in codes))
+        return dict(zip(codes, completed))
+
+    async def _fetch_code_navs(self, code: str, dates: list[date]) -> list[NavData]:
+        """Fetch one code's NAVs for the given dates, skipping failures.
+
+        Nearby dates are fetched with one date-range request; dates the
+        range does not answer fall back to single-date requests.
+        """
+        calendar = get_trading_days()
+
+        # NAV date each uncached target date resolves to, as in
+        # _try_fetch_fund_nav
+        trading_dates: dict[date, date] = {}
+        for target_date in dates:
+            if self.nav_cache and self.nav_cache.get(code, target_date, "eastmoney"):
+                continue
+            trading_dates[target_date] = (
+                target_date
+                if calendar.is_trading_day(target_date)
+                else calendar.get_previous_trading_day(target_date, max_days_back=10)
+            )
+
+        fetched: dict[date, NavData] = {}
+        for group in _group_nearby_dates(sorted(set(trading_dates.values()))):
+            if len(group) > 1:
+                navs = await self._fetch_nav_range(code, group[0], group[-1])
+                fetched.update(navs)
+                # Keep every NAV the range returned, not just the ones
+                # asked for; past NAVs never change
+                if self.nav_cache:
+                    for nav_date, range_nav in navs.items():
+                        self.nav_cache.set(
+                            code,
+                            nav_date,
+                            "eastmoney",
+                            range_nav.model_dump(mode="json"),
+                        )
+
+        code_results = []
+        for target_date in dates:
+            trading_date = trading_dates.get(target_date)
+            nav_data = fetched.get(trading_date) if trading_date else None
+            if nav_data is not None:
+                if self.nav_cache and target_date != trading_date:
+                    self.nav_cache.set(
+                        code,
+                        target_date,
+                        "eastmoney",
+                        nav_data.model_dump(mode="json"),
+                        value_date=trading_date,
                     )
-                    # Continue with other dates
-                    continue
-            results[code] = code_results
+                code_results.append(nav_data)
+                continue
+            try:
+                nav_data = await self._try_fetch_fund_nav(code, target_date)
+            except Exception as e:
+                print(
+                    f"Warning: Failed to fetch historical NAV for {code} "
+                    f"on {target_date}: {e}"
+                )
+                # Continue with other dates
+                continue
+            if nav_data is None:
+                print(f"Warning: No NAV data found for {code} on {target_date}")
+                continue
+            code_results.append(nav_data)
 
-        return results
+        return code_results
 
     async def fetch_fund_prices_as_nav(
         self, codes: list[str], dates: list[date]
     ) -> dict[str, list[PriceData]]:
         """Fetch fund NAVs and convert them to PriceData format for consistency."""
         nav_results = await self.fetch_historical_navs(codes, dates)
-        price_results = {}
-
-        for code, nav_data_list in nav_results.items():
-            price_data_list = []
-            for nav_data in nav_data_list:
-                # Convert NavData to PriceData (use NAV as price)
-                price_data = PriceData(
-                    code=nav_data.code,
-                    price_date=nav_data.nav_date,
-                    price_value=nav_data.nav,  # Use NAV as the "price"
-                    source="eastmoney",
-                )
-                price_data_list.append(price_data)
-            price_results[code] = price_data_list
-
-        return price_results
+        return {
+            code: [_nav_to_price(nav_data) for nav_data in nav_data_list]
+            for code, nav_data_list in nav_results.items()
+        }
 
     async def fetch_current_prices_as_nav(
         self, codes: list[str]
     ) -> dict[str, PriceData]:
         """Fetch current NAVs and convert them to PriceData format."""
         nav_results = await self.fetch_current_navs(codes)
-        price_results = {}
-
-        for code, nav_data in nav_results.items():
-            # Convert NavData to PriceData
-            price_data = PriceData(
-                code=nav_data.code,
-                price_date=nav_data.nav_date,
-                price_value=nav_data.nav,  # Use NAV as the "price"
-                source="eastmoney",
-            )
-            price_results[code] = price_data
-
-        return price_results
+        return {
+            code: _nav_to_price(nav_data) for code, nav_data in nav_results.items()
+        }
 
     async def validate_fund_code(self, code: str) -> bool:
         """Validate if a fund code exists and is active."""
@@ -195,17 +356,11 @@ class EastMoneyClient:
                 days=1
             )  # Use yesterday to avoid timing issues
 
-            url = (
-                f"{self.config.eastmoney.base_url}/f10/lsjz"
-                f"?fundCode={fund_code}"
-                f"&beginDate={today.strftime('%Y-%m-%d')}"
-                f"&endDate={today.strftime('%Y-%m-%d')}"
-                f"&pageIndex=1"
-                f"&pageSize=1"
+            url = self._nav_url.format(
+                code=fund_code, begin=today, end=today, page_size=1
             )
 
-            headers = self.config.get_headers("eastmoney")
-            response = await self._make_api_request(url, headers)
+            response = await self._make_api_request(url, self._headers)
 
             if response:
                 data = response
@@ -217,22 +372,53 @@ class EastMoneyClient:
 
     async def _make_api_request(
         self, url: str, headers: dict
+    ) -> dict[str, object] | None:
+        """Make an API request, sharing one call among concurrent duplicates.
+
+        A caller asking for a URL that is already being fetched awaits that
+        request instead of sending its own.
+        """
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._request_with_retries(url, headers))
+            self._inflight[url] = task
+            task.add_done_callback(lambda done: self._forget_inflight(url, done))
+        # Shielded so one caller cancelling does not cancel the others' fetch
+        return await asyncio.shield(task)
+
+    def _forget_inflight(self, url: str, task: asyncio.Future) -> None:
+        """Drop a finished request from the in-flight map."""
+        if self._inflight.get(url) is task:
+            del self._inflight[url]
+
+    async def _request_with_retries(
+        self, url: str, headers: dict
     ) -> dict[str, object] | None:
         """Make an API request with retry logic."""
         for attempt in range(self.config.eastmoney.retry_count + 1):
             try:
-                response = self.session.get(
-                    url, headers=headers, timeout=self.config.eastmoney.timeout
+                # Run the blocking HTTP call off the event loop so concurrent
+                # fetches overlap and actually use the pooled connections
+                response = await asyncio.to_thread(
+                    self.session.get,
+                    url,
+                    headers=headers,
+                    timeout=self.config.eastmoney.timeout,
                 )
                 response.raise_for_status()
                 data: dict[str, object] = response.json()
                 return data
 
-            except requests.exceptions.RequestException:
+            except requests.exceptions.RequestException as e:
                 if attempt < self.config.eastmoney.retry_count:
-                    await asyncio.sleep(
-                        self.config.eastmoney.retry_delay * (2**attempt)
-                    )
+                    # When throttled, wait as long as East Money asks rather
+                    # than guessing with backoff and retrying too early
+                    delay = _retry_after(e)
+                    if delay is None:
+                        delay = backoff_delay(
+                            self.config.eastmoney.retry_delay, attempt
+                        )
+                    await asyncio.sleep(delay)
                     continue
                 raise
 
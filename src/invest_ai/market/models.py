@@ -1,19 +1,21 @@
 """Market data specific models and utilities."""
 
-from datetime import date, datetime
+import time
+from collections import OrderedDict
+from datetime import date
 
 from invest_ai.models import InvestmentType, PriceData
 
 
 class MarketDataCache:
-    """Simple in-memory cache for market data."""
+    """Simple in-memory LRU cache for market data."""
 
-    def __init__(self, ttl_seconds: int = 3600):
-        """Initialize the cache with TTL in seconds."""
-        self.cache: dict[str, tuple[PriceData, datetime]] = (
-            {}
-        )  # key -> (data, timestamp)
+    def __init__(self, ttl_seconds: int = 3600, maxsize: int = 100_000):
+        """Initialize the cache with TTL in seconds and a size bound."""
+        # key -> (data, monotonic timestamp), least recently used first
+        self.cache: OrderedDict[str, tuple[PriceData, float]] = OrderedDict()
         self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
 
     def _generate_key(self, code: str, date: date, source: str) -> str:
         """Generate cache key."""
@@ -22,23 +24,24 @@ class MarketDataCache:
     def get(self, code: str, date: date, source: str) -> PriceData | None:
         """Get cached price data."""
         key = self._generate_key(code, date, source)
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            from datetime import timedelta
-
-            if datetime.now() - timestamp < timedelta(seconds=self.ttl_seconds):
-                return data
-            else:
-                # Expired, remove from cache
-                del self.cache[key]
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        data, timestamp = entry
+        if time.monotonic() - timestamp < self.ttl_seconds:
+            self.cache.move_to_end(key)
+            return data
+        # Expired, remove from cache
+        del self.cache[key]
         return None
 
     def set(self, code: str, date: date, source: str, data: PriceData) -> None:
-        """Cache price data."""
+        """Cache price data, evicting the least recently used entry if full."""
         key = self._generate_key(code, date, source)
-        from datetime import datetime
-
-        self.cache[key] = (data, datetime.now())
+        self.cache[key] = (data, time.monotonic())
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
 
     def clear(self) -> None:
         """Clear all cached data."""
@@ -152,12 +155,10 @@ class PriceQuery:
         dates: list[date],
         investment_type: InvestmentType,
     ):
-        """Initialize the query."""
-        self.codes = codes
-        self.dates = dates
+        """Initialize the query with sorted copies of codes and dates."""
+        self.codes = sorted(codes)
+        self.dates = sorted(dates)
         self.investment_type = investment_type
-        self.sort_codes()
-        self.sort_dates()
 
     def sort_codes(self) -> None:
         """Sort codes for consistent processing."""
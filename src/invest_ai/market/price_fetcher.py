@@ -1,6 +1,7 @@
 """Unified price fetching interface."""
 
 import asyncio
+from collections.abc import Awaitable, Callable
 from datetime import date
 
 from invest_ai.config import create_api_config
@@ -89,44 +90,34 @@ class PriceFetcher:
         self, codes: list[str], investment_type: InvestmentType
     ) -> dict[str, bool]:
         """Validate investment codes."""
-        results = {}
-
+        validate: Callable[[str], Awaitable[bool]]
         if investment_type == InvestmentType.STOCK:
             if not self.tushare_client:
                 # Default to invalid if client not available
                 return dict.fromkeys(codes, False)
-
-            # Validate in parallel
-            sem = asyncio.Semaphore(10)
-
-            async def validate_single(code: str) -> tuple[str, bool]:
-                async with sem:
-                    assert self.tushare_client is not None  # Type checker guarantee
-                    return code, await self.tushare_client.validate_code(code)
-
-            tasks = [validate_single(code) for code in codes]
-            completed = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in completed:
-                if isinstance(result, tuple):
-                    code, is_valid = result
-                    results[code] = is_valid
-
-        elif investment_type == InvestmentType.FUND:
+            validate = self.tushare_client.validate_code
+            limit = self.config.tushare.max_connections
+        else:
             # Validate fund codes with East Money
-            sem = asyncio.Semaphore(10)
+            validate = self.eastmoney_client.validate_fund_code
+            limit = self.config.eastmoney.max_connections
+
+        # Validate in parallel, no wider than the client's connection pool
+        sem = asyncio.Semaphore(limit)
 
-            async def validate_single(code: str) -> tuple[str, bool]:
-                async with sem:
-                    return code, await self.eastmoney_client.validate_fund_code(code)
+        async def validate_single(code: str) -> bool:
+            async with sem:
+                return await validate(code)
 
-            tasks = [validate_single(code) for code in codes]
-            completed = await asyncio.gather(*tasks, return_exceptions=True)
+        completed = await asyncio.gather(
+            *(validate_single(code) for code in codes), return_exceptions=True
+        )
 
-            for result in completed:
-                if isinstance(result, tuple):
-                    code, is_valid = result
-                    results[code] = is_valid
+        # gather keeps input order; codes whose check raised are left out
+        results: dict[str, bool] = {}
+        for code, is_valid in zip(codes, completed):
+            if isinstance(is_valid, bool):
+                results[code] = is_valid
 
         return results
 
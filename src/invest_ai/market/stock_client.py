@@ -6,8 +6,23 @@ from datetime import date, timedelta
 import requests
 
 from invest_ai.config import create_api_config
+from invest_ai.config.api_config import backoff_delay
 from invest_ai.models import PriceData
 
+from .file_cache import FileCache
+from .trading_days import get_trading_days
+
+# Exchange suffix by the first digit of a 6-digit stock code:
+# Shanghai (6), Shenzhen (0, 2, 3), Beijing (4, 8)
+_EXCHANGE_SUFFIXES = {
+    "6": ".SH",
+    "0": ".SZ",
+    "2": ".SZ",
+    "3": ".SZ",
+    "4": ".BJ",
+    "8": ".BJ",
+}
+
 
 class TushareClient:
     """Tushare Pro API client for Chinese stock market data."""
@@ -19,6 +34,13 @@ class TushareClient:
         """Initialize the Tushare client."""
         self.config = create_api_config()
         self.session = requests.Session()
+        # Requests run in worker threads (see _make_api_request); keep one
+        # pooled keep-alive connection per concurrent request
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.config.tushare.max_connections
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
         # Override token if provided
         if token:
@@ -29,29 +51,44 @@ class TushareClient:
                 "Tushare token is required. Set TUSHARE_TOKEN environment variable."
             )
 
+        # Request constants resolved once instead of on every API call
+        self._token = self.config.tushare.token
+        self._url = self.config.tushare.base_url
+        self._headers = self.config.get_headers("tushare")
+
+        self.price_cache = (
+            FileCache(self.config.cache_dir, self.config.cache_ttl)
+            if self.config.cache_dir
+            else None
+        )
+
     async def fetch_stock_price(self, code: str, target_date: date) -> PriceData:
         """Fetch stock price for a specific code and date."""
+        if self.price_cache:
+            cached = self.price_cache.get(code, target_date, "tushare")
+            if cached:
+                return PriceData.model_validate(cached)
+
         # Convert to Tushare format (6-digit code + .SZ or .SH)
         ts_code = self._convert_to_tushare_code(code)
 
-        # Try target date first, then adjust for trading days
-        trading_date = await self._get_trading_date(ts_code, target_date)
-
         # Try fetching data with fallback to previous trading days if no data
         max_fallback_days = 7  # Max 7 days of fallback
         last_error = None
 
-        for days_back in range(max_fallback_days + 1):
-            check_date = target_date - timedelta(days=days_back)
+        # Resolve the fallback window against the local calendar up front so
+        # API calls are only spent on days the exchange was open
+        calendar = get_trading_days()
+        candidate_dates = calendar.get_trading_dates_between(
+            target_date - timedelta(days=max_fallback_days), target_date
+        )
 
-            # Verify it's a trading day before making API call
-            actual_trading_date = await self._get_trading_date(ts_code, check_date)
-            if actual_trading_date != check_date:
-                continue  # Skip non-trading days
+        for actual_trading_date in reversed(candidate_dates):
+            days_back = (target_date - actual_trading_date).days
 
             request_data = {
                 "api_name": "daily",
-                "token": self.config.tushare.token,
+                "token": self._token,
                 "params": {
                     "ts_code": ts_code,
                     "trade_date": actual_trading_date.strftime("%Y%m%d"),
@@ -72,11 +109,15 @@ class TushareClient:
                     items = data["items"]
                     fields = data["fields"]
                     if items and len(items) > 0:
-                        # Convert items list to dict using fields
-                        item_dict = dict(zip(fields, items[0]))
-                        price = float(item_dict.get("close", 0))
+                        # Only the close price is needed; index it directly
+                        # rather than building a dict of the whole row
+                        row = items[0]
+                        close_index = fields.index("close") if "close" in fields else -1
+                        price = float(row[close_index]) if 0 <= close_index < len(row) else 0.0
                         if price <= 0:
-                            last_error = ValueError(f"Invalid price data for {code}: {item_dict}")
+                            last_error = ValueError(
+                                f"Invalid price data for {code}: {dict(zip(fields, row))}"
+                            )
                             continue
 
                         # Success! Return price data
@@ -87,9 +128,18 @@ class TushareClient:
                                 f"for {code} on {target_date}"
                             )
 
-                        return PriceData(
+                        price_data = PriceData(
                             code=code, price_date=actual_trading_date, price_value=price, source="tushare"
                         )
+                        if self.price_cache:
+                            self.price_cache.set(
+                                code,
+                                target_date,
+                                "tushare",
+                                price_data.model_dump(mode="json"),
+                                value_date=actual_trading_date,
+                            )
+                        return price_data
                     else:
                         # Empty items array - try next day
                         last_error = ValueError(f"No items in response for {code} on {actual_trading_date}")
@@ -108,10 +158,88 @@ class TushareClient:
             f"No data available for the target date or previous {max_fallback_days} trading days"
         ) from last_error
 
+    async def fetch_stock_prices_bulk(
+        self, codes: list[str], target_date: date
+    ) -> dict[str, PriceData]:
+        """Fetch close prices for many stock codes in one daily request.
+
+        Prices are for the last trading day on or before target_date.
+        Codes with no row for that day (suspended, delisted, not yet
+        listed) are left out so the caller can fall back to
+        fetch_stock_price, which searches earlier days.
+        """
+        prices: dict[str, PriceData] = {}
+        missing = []
+        for code in codes:
+            cached = (
+                self.price_cache.get(code, target_date, "tushare")
+                if self.price_cache
+                else None
+            )
+            if cached:
+                prices[code] = PriceData.model_validate(cached)
+            else:
+                missing.append(code)
+        if not missing:
+            return prices
+
+        trading_dates = get_trading_days().get_trading_dates_between(
+            target_date - timedelta(days=7), target_date
+        )
+        if not trading_dates:
+            return prices
+        trade_date = trading_dates[-1]
+
+        code_by_ts_code = {
+            self._convert_to_tushare_code(code): code for code in missing
+        }
+        request_data = {
+            "api_name": "daily",
+            "token": self._token,
+            "params": {
+                "ts_code": ",".join(code_by_ts_code),
+                "trade_date": trade_date.strftime("%Y%m%d"),
+                "fields": "ts_code,trade_date,close",
+            },
+        }
+        response = await self._make_api_request(request_data)
+
+        data = response.get("data")
+        if not isinstance(data, dict):
+            return prices
+        fields = data.get("fields") or []
+        if "ts_code" not in fields or "close" not in fields:
+            return prices
+        code_index = fields.index("ts_code")
+        close_index = fields.index("close")
+
+        for row in data.get("items") or []:
+            matched_code = code_by_ts_code.get(row[code_index])
+            if matched_code is None:
+                continue
+            price = float(row[close_index] or 0.0)
+            if price <= 0:
+                continue
+            price_data = PriceData(
+                code=matched_code,
+                price_date=trade_date,
+                price_value=price,
+                source="tushare",
+            )
+            if self.price_cache:
+                self.price_cache.set(
+                    matched_code,
+                    target_date,
+                    "tushare",
+                    price_data.model_dump(mode="json"),
+                    value_date=trade_date,
+                )
+            prices[matched_code] = price_data
+
+        return prices
+
     async def fetch_current_prices(self, codes: list[str]) -> dict[str, PriceData]:
         """Fetch current prices for multiple stock codes."""
-        results = {}
-
         # Process in parallel with limited concurrency
         semaphore = asyncio.Semaphore(10)  # Limit concurrent requests
 
@@ -126,68 +254,56 @@ class TushareClient:
                     print(f"Warning: Failed to fetch price for {code}: {e}")
                     return code, None
 
+        # fetch_single reports its own failures, so every result is a pair
         tasks = [fetch_single(code) for code in codes]
-        completed = await asyncio.gather(*tasks, return_exceptions=True)
+        completed = await asyncio.gather(*tasks)
 
-        for result in completed:
-            if isinstance(result, tuple):
-                code, price_data = result
-                if price_data:
-                    results[code] = price_data
-
-        return results
+        return {code: price_data for code, price_data in completed if price_data}
 
     async def fetch_historical_prices(
         self, codes: list[str], dates: list[date]
     ) -> dict[str, list[PriceData]]:
         """Fetch historical prices for multiple codes and dates."""
-        results = {}
+        results: dict[str, list[PriceData]] = {code: [] for code in codes}
 
-        for code in codes:
-            code_results = []
-            for target_date in dates:
+        # Process in parallel with limited concurrency
+        semaphore = asyncio.Semaphore(10)  # Limit concurrent requests
+
+        async def fetch_single(code: str, target_date: date) -> PriceData | None:
+            async with semaphore:
                 try:
-                    price_data = await self.fetch_stock_price(code, target_date)
-                    code_results.append(price_data)
+                    return await self.fetch_stock_price(code, target_date)
                 except Exception as e:
                     print(
                         f"Warning: Failed to fetch historical price for {code} on {target_date}: {e}"
                     )
-                    # Continue with other dates
-                    continue
-            results[code] = code_results
+                    return None
+
+        requests_made = [(code, target_date) for code in codes for target_date in dates]
+        completed = await asyncio.gather(
+            *(fetch_single(code, target_date) for code, target_date in requests_made)
+        )
+
+        # gather preserves order, so each code keeps its dates in request order
+        for (code, _), price_data in zip(requests_made, completed):
+            if price_data:
+                results[code].append(price_data)
 
         return results
 
     def _convert_to_tushare_code(self, code: str) -> str:
         """Convert 6-digit code to Tushare format with exchange suffix."""
         code = code.zfill(6)
-
-        # Shanghai Stock Exchange (starts with 6)
-        if code.startswith("6"):
-            return f"{code}.SH"
-
-        # Shenzhen Stock Exchange (starts with 0, 3)
-        elif code.startswith(("0", "3", "2")):
-            return f"{code}.SZ"
-
-        # Beijing Stock Exchange (starts with 8, 4)
-        elif code.startswith(("8", "4")):
-            return f"{code}.BJ"
-
-        else:
-            # Default to Shenzhen for unknown patterns
-            return f"{code}.SZ"
+        # Unknown prefixes default to Shenzhen
+        return code + _EXCHANGE_SUFFIXES.get(code[0], ".SZ")
 
     async def _get_trading_date(self, ts_code: str, target_date: date) -> date:
         """Get the nearest trading date to the target date.
         
         Uses local trading calendar to avoid API calls.
         """
-        from .trading_days import TradingDaysChina
-        
-        calendar = TradingDaysChina()
-        
+        calendar = get_trading_days()
+
         # First try the target date
         if calendar.is_trading_day(target_date):
             return target_date
@@ -203,13 +319,16 @@ class TushareClient:
 
     async def _make_api_request(self, request_data: dict) -> dict[str, object]:
         """Make an API request with retry logic and rate limit handling."""
-        headers = self.config.get_headers("tushare")
-        url = self.config.tushare.base_url
+        headers = self._headers
+        url = self._url
         max_rate_limit_retries = 3  # Max times to retry on rate limit
 
         for attempt in range(self.config.tushare.retry_count + 1):
             try:
-                response = self.session.post(
+                # Run the blocking HTTP call off the event loop so concurrent
+                # fetches overlap instead of serializing on the socket read
+                response = await asyncio.to_thread(
+                    self.session.post,
                     url,
                     json=request_data,
                     headers=headers,
@@ -234,7 +353,9 @@ class TushareClient:
 
             except requests.exceptions.RequestException:
                 if attempt < self.config.tushare.retry_count:
-                    await asyncio.sleep(self.config.tushare.retry_delay * (2**attempt))
+                    await asyncio.sleep(
+                        backoff_delay(self.config.tushare.retry_delay, attempt)
+                    )
                     continue
                 raise
 
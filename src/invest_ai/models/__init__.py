@@ -1,10 +1,11 @@
 """Core data models for Invest AI."""
 
+from bisect import insort
 from datetime import date
 from enum import Enum
 from typing import Any, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 # =============================================================================
 # Enums
@@ -26,6 +27,13 @@ class TransactionType(str, Enum):
     DIVIDEND = "dividend"
 
 
+# Fund codes start with 5 (exchange-traded) or 1; everything else is a stock
+_INVESTMENT_TYPE_BY_PREFIX = {
+    "5": InvestmentType.FUND,
+    "1": InvestmentType.FUND,
+}
+
+
 # =============================================================================
 # Core Data Models
 # =============================================================================
@@ -92,11 +100,12 @@ class Transaction(BaseModel):
 
     def get_investment_type(self) -> InvestmentType:
         """Get the investment type based on transaction characteristics."""
-        return (
-            InvestmentType.FUND
-            if self.code.startswith(("5", "1"))
-            else InvestmentType.STOCK
-        )
+        return self.classify_code(self.code)
+
+    @staticmethod
+    def classify_code(code: str) -> InvestmentType:
+        """Get the investment type for a code from its leading digit."""
+        return _INVESTMENT_TYPE_BY_PREFIX.get(code[:1], InvestmentType.STOCK)
 
     @property
     def date(self) -> date | None:
@@ -109,11 +118,27 @@ class Transaction(BaseModel):
         self.transaction_date = value
 
 
+def _transaction_date_key(tx: Transaction) -> date:
+    """Sort key placing undated transactions first."""
+    return tx.transaction_date or date.min
+
+
 class TransactionList(BaseModel):
-    """Container for multiple transactions."""
+    """Container for multiple transactions, kept in date order.
+
+    Transactions are sorted once on construction and inserted in order
+    afterwards, so consumers can rely on chronological order without
+    re-sorting.
+    """
 
     transactions: list[Transaction] = Field(default_factory=list)
 
+    @model_validator(mode="after")
+    def _sort_transactions(self) -> "TransactionList":
+        """Sort transactions by date (stable, so same-day order is kept)."""
+        self.transactions.sort(key=_transaction_date_key)
+        return self
+
     def __len__(self) -> int:
         return len(self.transactions)
 
@@ -122,17 +147,16 @@ class TransactionList(BaseModel):
 
     def append(self, transaction: Transaction) -> None:
         """Add a transaction."""
-        self.transactions.append(transaction)
+        insort(self.transactions, transaction, key=_transaction_date_key)
 
     def extend(self, transactions: list[Transaction]) -> None:
         """Add multiple transactions."""
         self.transactions.extend(transactions)
+        self.sort_by_date()
 
     def sort_by_date(self) -> None:
         """Sort transactions by date."""
-        self.transactions.sort(
-            key=lambda x: x.transaction_date if x.transaction_date else date.min
-        )
+        self.transactions.sort(key=_transaction_date_key)
 
     def get_codes(self) -> set[str]:
         """Get all unique investment codes."""
@@ -147,6 +171,9 @@ class TransactionList(BaseModel):
 
     def filter_by_code(self, code: str) -> "TransactionList":
         """Filter transactions by investment code."""
+        # Scanned on every call: transactions is a public mutable list, so a
+        # cached per-code index could go stale. Callers that need every code
+        # should group the list in one pass instead.
         filtered = [tx for tx in self.transactions if tx.code == code]
         return TransactionList(transactions=filtered)
 
@@ -162,7 +189,7 @@ class TransactionList(BaseModel):
 
     def add_transaction(self, transaction: "Transaction") -> None:
         """Add a transaction to the list."""
-        self.transactions.append(transaction)
+        self.append(transaction)
 
 
 # =============================================================================
@@ -292,14 +319,18 @@ class FifoQueue(BaseModel):
         """Execute a sell using FIFO method."""
         realized_gains = []
         remaining_to_sell = sell_quantity
+        # Walk a head index and drop consumed lots once at the end instead
+        # of popping from the front of the list per lot
+        purchases = self.purchases
+        head = 0
 
-        while remaining_to_sell > 0 and self.purchases:
-            purchase = self.purchases[0]
+        while remaining_to_sell > 0 and head < len(purchases):
+            purchase = purchases[head]
             available = purchase.remaining_quantity
 
             if available <= remaining_to_sell:
                 sell_quantity_from_this = available
-                self.purchases.pop(0)
+                head += 1
             else:
                 sell_quantity_from_this = remaining_to_sell
                 purchase.remaining_quantity -= remaining_to_sell
@@ -322,6 +353,8 @@ class FifoQueue(BaseModel):
 
             remaining_to_sell -= sell_quantity_from_this
 
+        del purchases[:head]
+
         if remaining_to_sell > 0:
             raise ValueError(
                 f"Cannot sell {sell_quantity} shares of {self.code}, only {sell_quantity - remaining_to_sell} available"
@@ -335,14 +368,21 @@ class FifoQueue(BaseModel):
 
     def get_total_cost_basis(self) -> float:
         """Get total cost basis."""
-        return sum(p.remaining_cost() for p in self.purchases)
+        # Inline remaining_cost() to skip a method call per lot
+        return sum(p.remaining_quantity * p.unit_price for p in self.purchases)
 
     def get_average_cost(self) -> float:
         """Get average cost per share."""
-        total_qty = self.get_total_quantity()
+        # Accumulate quantity and cost together instead of two passes
+        total_qty = 0.0
+        total_cost = 0.0
+        for p in self.purchases:
+            remaining_quantity = p.remaining_quantity
+            total_qty += remaining_quantity
+            total_cost += remaining_quantity * p.unit_price
         if total_qty == 0:
             return 0.0
-        return self.get_total_cost_basis() / total_qty
+        return total_cost / total_qty
 
     def update_total_quantity(self) -> None:
         """Update total quantity by removing purchases with zero remaining quantity."""
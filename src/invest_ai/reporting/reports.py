@@ -153,8 +153,8 @@ class ReportGenerator:
         table.add_column("Metric", style="bold green", width=20)
         table.add_column("Value", justify="right", width=15)
 
-        table.add_row("First Investment:", result.first_investment.strftime("%Y-%m-%d"))
-        table.add_row("Current Date:", date.today().strftime("%Y-%m-%d"))
+        table.add_row("First Investment:", result.first_investment.isoformat())
+        table.add_row("Current Date:", date.today().isoformat())
         table.add_row("Total Invested:", f"¥{result.total_invested:,.2f}")
         table.add_row("Current Value:", f"¥{result.current_value:,.2f}")
         table.add_row("Total P&L:", self._format_gain_loss(result.total_gain))
@@ -86,9 +86,7 @@ class TransactionLoader:
             else:
                 raise ValueError("Invalid YAML format: expected list or dict")
 
-            # Sort by date
-            transactions.sort(key=lambda x: x.date)
-
+            # TransactionList sorts by date on construction
             return TransactionList(transactions=transactions)
 
         except yaml.YAMLError as e:
@@ -13,7 +13,7 @@ from invest_ai.models import (
 
 
 @pytest.fixture(autouse=True)
-def mock_external_apis():
+def mock_external_apis(monkeypatch):
     """Auto-mock CLI price fetching to prevent real API access during tests.
     
     This fixture runs automatically for all tests to ensure:
@@ -24,7 +24,10 @@ def mock_external_apis():
     Note: Individual tests can still mock specific API methods if needed.
     """
     from unittest.mock import patch, AsyncMock
-    
+
+    # Keep the on-disk price cache out of tests so results never leak between runs
+    monkeypatch.setenv("CACHE_ENABLED", "false")
+
     # Mock both price fetching methods - history mode and annual mode
     with patch(
         "invest_ai.cli.main.CLIController._fetch_current_prices_for_codes",
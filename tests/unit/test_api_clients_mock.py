@@ -1,13 +1,19 @@
 """Tests for market API clients with mocking."""
 
+import asyncio
+
 import pytest
 from datetime import date
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 import requests
 
+from invest_ai.market.file_cache import FileCache
+from invest_ai.market.models import MarketDataSummary
 from invest_ai.market.fund_client import EastMoneyClient
 from invest_ai.market.stock_client import TushareClient
 from invest_ai.market.price_fetcher import PriceFetcher
+from invest_ai.market.trading_days import get_trading_days
+from invest_ai.models import InvestmentType, NavData
 
 
 class TestEastMoneyClientMocked:
@@ -107,6 +113,54 @@ class TestPriceFetcherMocked:
         # tushare_client should be None if no token
         # This depends on implementation
 
+    async def test_validate_fund_codes_within_pool_limit(self):
+        """Test fund validation never exceeds the East Money pool size."""
+        fetcher = PriceFetcher()
+        fetcher.config.eastmoney.max_connections = 2
+        in_flight = 0
+        peak = 0
+
+        async def validate(code):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return code != "000000"
+
+        fetcher.eastmoney_client.validate_fund_code = validate
+        codes = ["110022", "000000", "161725", "510300", "001632"]
+
+        results = await fetcher.validate_codes(codes, InvestmentType.FUND)
+
+        assert results == {code: code != "000000" for code in codes}
+        assert peak == 2
+
+    async def test_validate_stock_codes_within_configured_limit(self):
+        """Test stock validation is bounded by tushare.max_connections."""
+        fetcher = PriceFetcher()
+        fetcher.config.tushare.max_connections = 3
+        in_flight = 0
+        peak = 0
+
+        async def validate(code):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            if code == "999999":
+                raise RuntimeError("lookup failed")
+            return True
+
+        fetcher.tushare_client = Mock(validate_code=validate)
+        codes = ["600000", "000001", "999999", "300750", "601318"]
+
+        results = await fetcher.validate_codes(codes, InvestmentType.STOCK)
+
+        assert results == {code: True for code in codes if code != "999999"}
+        assert peak == 3
+
 
 class TestEastMoneyClientEdgeCases:
     """Edge case tests for EastMoneyClient."""
@@ -117,6 +171,227 @@ class TestEastMoneyClientEdgeCases:
         # Check if session exists
         assert hasattr(client, 'session')
 
+    def test_session_pool_sized_to_concurrency(self):
+        """Test that the shared session pools one connection per concurrent request."""
+        client = EastMoneyClient()
+        adapter = client.session.get_adapter(client.config.eastmoney.base_url)
+        assert adapter._pool_maxsize == client.config.eastmoney.max_connections
+
+    @pytest.mark.asyncio
+    async def test_requests_run_off_event_loop(self):
+        """Test blocking session.get calls run in worker threads."""
+        import threading
+
+        loop_thread = threading.get_ident()
+        calling_threads = []
+
+        def fake_get(url, headers=None, timeout=None):
+            calling_threads.append(threading.get_ident())
+            response = Mock()
+            response.json.return_value = {"ok": True}
+            return response
+
+        client = EastMoneyClient()
+        with patch.object(client.session, "get", side_effect=fake_get):
+            data = await client._make_api_request("http://example.test", {})
+
+        assert data == {"ok": True}
+        assert calling_threads and loop_thread not in calling_threads
+
+    async def test_fetch_fund_nav_reuses_shared_calendar(self):
+        """Test NAV lookups use the shared calendar instead of building one."""
+        get_trading_days()
+        client = EastMoneyClient()
+        client.nav_cache = None
+        response = {"Data": {"LSJZList": [{"DWJZ": "1.50", "LJJZ": "2.50"}]}}
+
+        with (
+            patch.object(client, "_make_api_request", AsyncMock(return_value=response)),
+            patch("invest_ai.market.trading_days.TradingDaysChina") as calendar_class,
+        ):
+            await client.fetch_fund_nav("110022", date(2024, 3, 9))
+
+        calendar_class.assert_not_called()
+
+    async def test_fetch_fund_nav_request_url(self):
+        """Test a weekend lookup requests the previous trading day's NAV."""
+        client = EastMoneyClient()
+        client.nav_cache = None
+        response = {"Data": {"LSJZList": [{"DWJZ": "1.50", "LJJZ": "2.50"}]}}
+        request = AsyncMock(return_value=response)
+
+        with patch.object(client, "_make_api_request", request):
+            await client.fetch_fund_nav("110022", date(2024, 3, 9))
+
+        url = request.call_args.args[0]
+        assert url == (
+            f"{client.config.eastmoney.base_url}/f10/lsjz?fundCode=110022"
+            "&beginDate=2024-03-08&endDate=2024-03-08&pageIndex=1&pageSize=1"
+        )
+
+    async def test_concurrent_duplicate_requests_share_one_call(self):
+        """Test identical in-flight requests are coalesced into one HTTP call."""
+        response = Mock()
+        response.json.return_value = {"ok": True}
+        client = EastMoneyClient()
+
+        with patch.object(client.session, "get", return_value=response) as get:
+            first, second = await asyncio.gather(
+                client._make_api_request("http://example.test/a", {}),
+                client._make_api_request("http://example.test/a", {}),
+            )
+            third = await client._make_api_request("http://example.test/a", {})
+
+        assert first == second == third == {"ok": True}
+        assert get.call_count == 2
+        assert client._inflight == {}
+
+    async def test_missing_nav_is_none_internally_and_error_publicly(self):
+        """Test a date without a NAV returns None in batches but raises alone."""
+        client = EastMoneyClient()
+        client.nav_cache = None
+        empty = AsyncMock(return_value={"Data": {"LSJZList": []}})
+
+        with patch.object(client, "_make_api_request", empty):
+            assert await client._try_fetch_fund_nav("110022", date(2024, 3, 8)) is None
+            results = await client.fetch_historical_navs(
+                ["110022"], [date(2024, 3, 8)]
+            )
+            with pytest.raises(RuntimeError, match="No NAV data found"):
+                await client.fetch_fund_nav("110022", date(2024, 3, 8))
+
+        assert results == {"110022": []}
+
+    async def test_rate_limited_retry_waits_for_retry_after(self):
+        """Test a 429 retry sleeps for the server's Retry-After seconds."""
+        throttled = Mock(status_code=429, headers={"Retry-After": "7"})
+        throttled.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            response=throttled
+        )
+        ok = Mock()
+        ok.json.return_value = {"ok": True}
+
+        client = EastMoneyClient()
+        with (
+            patch.object(client.session, "get", side_effect=[throttled, ok]),
+            patch("invest_ai.market.fund_client.asyncio.sleep") as sleep,
+        ):
+            data = await client._make_api_request("http://example.test", {})
+
+        assert data == {"ok": True}
+        sleep.assert_awaited_once_with(7.0)
+
+    async def test_historical_navs_batch_nearby_dates(self):
+        """Test nearby dates share one range request; distant ones do not."""
+        client = EastMoneyClient()
+        client.nav_cache = None
+        range_rows = [
+            {"FSRQ": "2024-03-06", "DWJZ": "1.03", "LJJZ": "2.03"},
+            {"FSRQ": "2024-03-05", "DWJZ": "1.02", "LJJZ": ""},
+            {"FSRQ": "2024-03-04", "DWJZ": "1.01", "LJJZ": "2.01"},
+        ]
+
+        async def fake_request(url, headers):
+            if url.endswith("pageSize=1"):
+                return {"Data": {"LSJZList": [{"DWJZ": "1.50", "LJJZ": "2.50"}]}}
+            return {"Data": {"LSJZList": range_rows}}
+
+        dates = [date(2024, 3, 4), date(2024, 3, 5), date(2024, 3, 6), date(2024, 6, 3)]
+        with patch.object(
+            client, "_make_api_request", side_effect=fake_request
+        ) as request:
+            results = await client.fetch_historical_navs(["110022"], dates)
+
+        assert request.call_count == 2
+        navs = results["110022"]
+        assert [nav.nav_date for nav in navs] == dates
+        assert [nav.nav for nav in navs] == [1.01, 1.02, 1.03, 1.50]
+        assert navs[1].accumulated_nav is None
+
+    async def test_historical_navs_fetch_codes_concurrently(self):
+        """Test codes are fetched in parallel, within the pool size."""
+        client = EastMoneyClient()
+        client.config.eastmoney.max_connections = 2
+        in_flight = 0
+        peak = 0
+
+        async def fetch_code(code, dates):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return [NavData(code=code, nav_date=dates[0], nav=1.0)]
+
+        codes = ["110022", "161725", "001632", "005827"]
+        with patch.object(client, "_fetch_code_navs", side_effect=fetch_code):
+            results = await client.fetch_historical_navs(codes, [date(2024, 3, 8)])
+
+        assert list(results) == codes
+        assert all(navs[0].code == code for code, navs in results.items())
+        assert peak == 2
+
+    async def test_current_navs_record_summary(self):
+        """Test fetched and failed codes are counted in the summary."""
+        client = EastMoneyClient()
+        nav = NavData(code="110022", nav_date=date(2024, 3, 8), nav=1.5)
+
+        async def fetch(code, target_date):
+            if code == "000000":
+                raise RuntimeError("no such fund")
+            return nav
+
+        summary = MarketDataSummary()
+        with patch.object(client, "_try_fetch_fund_nav", side_effect=fetch):
+            results = await client.fetch_current_navs(["110022", "000000"], summary)
+
+        assert results == {"110022": nav}
+        assert summary.successful_requests == 1
+        assert summary.failed_requests == 1
+        assert summary.data_sources == {"eastmoney": 1}
+
+    async def test_fund_prices_as_nav_converts_each_nav(self):
+        """Test historical NAVs come back as eastmoney PriceData per code."""
+        client = EastMoneyClient()
+        navs = {
+            "110022": [
+                NavData(code="110022", nav_date=date(2024, 3, 4), nav=1.01),
+                NavData(code="110022", nav_date=date(2024, 3, 5), nav=1.02),
+            ],
+            "161725": [],
+        }
+
+        with patch.object(client, "fetch_historical_navs", AsyncMock(return_value=navs)):
+            prices = await client.fetch_fund_prices_as_nav(
+                ["110022", "161725"], [date(2024, 3, 4), date(2024, 3, 5)]
+            )
+
+        assert prices["161725"] == []
+        assert [(p.price_date, p.price_value, p.source) for p in prices["110022"]] == [
+            (date(2024, 3, 4), 1.01, "eastmoney"),
+            (date(2024, 3, 5), 1.02, "eastmoney"),
+        ]
+
+    async def test_historical_nav_range_rows_cached_by_nav_date(self, tmp_path):
+        """Test every NAV a range returns is cached, including unrequested days."""
+        client = EastMoneyClient()
+        client.nav_cache = FileCache(tmp_path)
+        rows = [
+            {"FSRQ": "2024-03-06", "DWJZ": "1.03", "LJJZ": "2.03"},
+            {"FSRQ": "2024-03-05", "DWJZ": "1.02", "LJJZ": "2.02"},
+            {"FSRQ": "2024-03-04", "DWJZ": "1.01", "LJJZ": "2.01"},
+        ]
+        request = AsyncMock(return_value={"Data": {"LSJZList": rows}})
+
+        with patch.object(client, "_make_api_request", request):
+            await client.fetch_historical_navs(
+                ["110022"], [date(2024, 3, 4), date(2024, 3, 6)]
+            )
+            nav = await client.fetch_fund_nav("110022", date(2024, 3, 5))
+
+        request.assert_awaited_once()
+        assert nav.nav == 1.02
+
     @patch('requests.Session.get')
     def test_empty_response(self, mock_get):
         """Test handling empty response."""
@@ -153,3 +428,115 @@ class TestTushareClientEdgeCases:
         
         client = TushareClient(token="test_token")
         # Should handle timeout
+
+
+class TestTushareClientHistorical:
+    """Tests for TushareClient historical price fetching."""
+
+    @pytest.mark.asyncio
+    async def test_fetch_historical_prices_keeps_order_and_skips_failures(self):
+        """Test concurrent historical fetch keeps date order and drops failures."""
+        from invest_ai.models import PriceData
+
+        async def fake_fetch(code, target_date):
+            if code == "600000" and target_date.year == 2023:
+                raise RuntimeError("No data")
+            return PriceData(
+                code=code, price_date=target_date, price_value=10.0, source="tushare"
+            )
+
+        client = TushareClient(token="test_token")
+        dates = [date(2022, 12, 30), date(2023, 12, 29)]
+        with patch.object(client, "fetch_stock_price", side_effect=fake_fetch):
+            results = await client.fetch_historical_prices(["000001", "600000"], dates)
+
+        assert [p.price_date for p in results["000001"]] == dates
+        assert [p.price_date for p in results["600000"]] == [date(2022, 12, 30)]
+
+    def test_convert_to_tushare_code_suffixes(self):
+        """Test exchange suffix mapping by leading digit."""
+        client = TushareClient(token="test_token")
+        assert client._convert_to_tushare_code("600000") == "600000.SH"
+        assert client._convert_to_tushare_code("1") == "000001.SZ"
+        assert client._convert_to_tushare_code("300750") == "300750.SZ"
+        assert client._convert_to_tushare_code("830799") == "830799.BJ"
+        assert client._convert_to_tushare_code("900901") == "900901.SZ"
+
+    @pytest.mark.asyncio
+    async def test_fetch_stock_price_skips_non_trading_days_locally(self):
+        """Test a weekend date costs a single API call for the prior trading day."""
+        client = TushareClient(token="test_token")
+        response = {
+            "code": 0,
+            "data": {"fields": ["ts_code", "close"], "items": [["000001.SZ", 12.5]]},
+        }
+        with patch.object(
+            client, "_make_api_request", new=AsyncMock(return_value=response)
+        ) as mock_request:
+            price = await client.fetch_stock_price("000001", date(2023, 1, 8))
+
+        assert mock_request.await_count == 1
+        assert price.price_date == date(2023, 1, 6)
+        assert price.price_value == 12.5
+
+    @pytest.mark.asyncio
+    async def test_fetch_stock_price_uses_file_cache(self, tmp_path):
+        """Test a cached (code, date) lookup skips the API on the next call."""
+        client = TushareClient(token="test_token")
+        client.price_cache = FileCache(tmp_path)
+        response = {
+            "code": 0,
+            "data": {"fields": ["ts_code", "close"], "items": [["000001.SZ", 12.5]]},
+        }
+        with patch.object(
+            client, "_make_api_request", new=AsyncMock(return_value=response)
+        ) as mock_request:
+            first = await client.fetch_stock_price("000001", date(2023, 1, 6))
+            second = await client.fetch_stock_price("000001", date(2023, 1, 6))
+
+        assert mock_request.await_count == 1
+        assert second == first
+
+    @pytest.mark.asyncio
+    async def test_fetch_stock_prices_bulk_single_request(self, tmp_path):
+        """Test many codes share one daily request on the prior trading day."""
+        client = TushareClient(token="test_token")
+        client.price_cache = FileCache(tmp_path)
+        client.price_cache.set(
+            "300750",
+            date(2023, 1, 8),
+            "tushare",
+            {
+                "code": "300750",
+                "price_date": "2023-01-06",
+                "price_value": 400.0,
+                "source": "tushare",
+            },
+        )
+        response = {
+            "code": 0,
+            "data": {
+                "fields": ["ts_code", "trade_date", "close"],
+                "items": [
+                    ["000001.SZ", "20230106", 12.5],
+                    ["600000.SH", "20230106", None],
+                ],
+            },
+        }
+        with patch.object(
+            client, "_make_api_request", new=AsyncMock(return_value=response)
+        ) as mock_request:
+            prices = await client.fetch_stock_prices_bulk(
+                ["000001", "600000", "300750"], date(2023, 1, 8)
+            )
+
+        mock_request.assert_awaited_once()
+        params = mock_request.await_args.args[0]["params"]
+        assert params["ts_code"] == "000001.SZ,600000.SH"
+        assert params["trade_date"] == "20230106"
+        assert {code: p.price_value for code, p in prices.items()} == {
+            "000001": 12.5,
+            "300750": 400.0,
+        }
+        assert prices["000001"].price_date == date(2023, 1, 6)
+        assert client.price_cache.get("000001", date(2023, 1, 8), "tushare")
@@ -1,10 +1,12 @@
 """Tests for calculation engine (FIFO, annual, history)."""
 
 from datetime import date
+from unittest.mock import patch
 
 import pytest
 
 from invest_ai.calculation import AnnualCalculator, FifoCalculator, HistoryCalculator
+from invest_ai.calculation.annual import group_by_code
 from invest_ai.models import (
     InvestmentType,
     PriceData,
@@ -202,6 +204,60 @@ class TestFifoCalculator:
         with pytest.raises(ValueError, match="Insufficient inventory"):
             calculator.allocate_cost(sell_transaction, queue)
 
+        # A rejected sale must not consume any lots
+        assert queue.total_quantity == 50.0
+
+    def test_allocate_cost_consumes_queue_in_place(self):
+        """Test sequential sales thread the same queue and drop exhausted lots."""
+        transactions = [
+            Transaction(
+                code="000001",
+                date=date(2023, 1, 15),
+                type=TransactionType.BUY,
+                quantity=100.0,
+                unit_price=10.00,
+                total_amount=1000.00,
+            ),
+            Transaction(
+                code="000001",
+                date=date(2023, 2, 15),
+                type=TransactionType.BUY,
+                quantity=50.0,
+                unit_price=12.00,
+                total_amount=600.00,
+            ),
+        ]
+
+        calculator = FifoCalculator()
+        queue = calculator.process_fifo_queue(transactions)
+
+        first_sell = Transaction(
+            code="000001",
+            date=date(2023, 6, 15),
+            type=TransactionType.SELL,
+            quantity=100.0,
+            unit_price=15.00,
+            total_amount=1500.00,
+        )
+        first = calculator.allocate_cost(first_sell, queue)
+
+        assert first.remaining_queue is queue
+        assert len(queue.purchases) == 1
+        assert queue.purchases[0].unit_price == 12.00
+
+        second_sell = Transaction(
+            code="000001",
+            date=date(2023, 7, 15),
+            type=TransactionType.SELL,
+            quantity=20.0,
+            unit_price=15.00,
+            total_amount=300.00,
+        )
+        second = calculator.allocate_cost(second_sell, queue)
+
+        assert second.cost_basis == 240.00
+        assert queue.total_quantity == 30.0
+
     def test_calculate_realized_gain(self):
         """Test realized gain calculation."""
         calculator = FifoCalculator()
@@ -354,6 +410,83 @@ class TestAnnualCalculator:
 
         assert dividend_income == 350.00
 
+    def test_calculate_year_start_value(self):
+        """Test year-start value uses remaining shares after sells and stock dividends."""
+        pre_year_transactions = [
+            Transaction(
+                code="000001",
+                date=date(2022, 1, 15),
+                type=TransactionType.BUY,
+                quantity=100.0,
+                unit_price=10.00,
+                total_amount=1000.00,
+            ),
+            Transaction(
+                code="000001",
+                date=date(2022, 3, 15),
+                type=TransactionType.DIVIDEND,
+                quantity=10.0,
+                unit_price=0.00,
+                total_amount=0.00,
+            ),
+            Transaction(
+                code="000001",
+                date=date(2022, 6, 15),
+                type=TransactionType.SELL,
+                quantity=40.0,
+                unit_price=12.00,
+                total_amount=480.00,
+            ),
+            Transaction(
+                code="000002",
+                date=date(2022, 7, 15),
+                type=TransactionType.DIVIDEND,
+                quantity=0.0,
+                unit_price=0.00,
+                total_amount=50.00,
+            ),
+        ]
+        year_start_prices = {
+            "000001": PriceData(
+                code="000001",
+                price_date=date(2022, 12, 30),
+                price_value=11.00,
+                source="test",
+            )
+        }
+
+        calculator = AnnualCalculator()
+        with patch.object(
+            calculator.fifo_calculator, "allocate_sales"
+        ) as allocate_sales:
+            result = calculator.calculate_year_start_value(
+                TransactionList(transactions=pre_year_transactions), year_start_prices
+            )
+
+        # The year-start snapshot needs no FIFO replay
+        allocate_sales.assert_not_called()
+        assert result["positions"] == {"000001": 70.0}
+        assert result["current_value"] == 770.0
+
+    def test_group_by_code_preserves_order(self):
+        """Test grouping transactions by code keeps the original order per code."""
+        transactions = [
+            Transaction(
+                code=code,
+                date=date(2023, month, 1),
+                type=TransactionType.BUY,
+                quantity=10.0,
+                unit_price=1.00,
+                total_amount=10.00,
+            )
+            for month, code in enumerate(["000001", "000002", "000001"], start=1)
+        ]
+
+        by_code = group_by_code(transactions)
+
+        assert list(by_code) == ["000001", "000002"]
+        assert [tx.date.month for tx in by_code["000001"]] == [1, 3]
+
 
 class TestHistoryCalculator:
     """Test history calculation."""
@@ -413,6 +546,66 @@ class TestHistoryCalculator:
 
         assert dividend_income == 100.00
 
+    def test_bucket_matches_separate_passes(self):
+        """Test the single-pass bucket agrees with the per-metric methods."""
+        calculator = HistoryCalculator()
+        transactions = TransactionList(transactions=self.setup_sample_data())
+
+        by_code, total_invested, dividend_income = calculator._bucket(transactions)
+
+        assert set(by_code) == transactions.get_codes()
+        assert [tx.date for tx in by_code["000001"]] == [
+            date(2023, 1, 15),
+            date(2023, 3, 15),
+            date(2023, 6, 15),
+        ]
+        assert total_invested == calculator.calculate_total_invested(transactions)
+        assert dividend_income == calculator.calculate_dividend_income(transactions)
+
+    def test_code_gains_reflect_in_place_edits(self):
+        """Test repeated calls on an edited list never return stale gains."""
+        calculator = HistoryCalculator()
+        current_prices = {
+            "000001": PriceData(
+                code="000001",
+                price_date=date(2023, 12, 31),
+                price_value=12.0,
+                source="test",
+            )
+        }
+        sell = Transaction(
+            code="000001",
+            type=TransactionType.SELL,
+            quantity=50,
+            unit_price=12.0,
+            total_amount=600.0,
+            transaction_date=date(2023, 6, 1),
+        )
+        transactions = TransactionList(
+            transactions=[
+                Transaction(
+                    code="000001",
+                    type=TransactionType.BUY,
+                    quantity=100,
+                    unit_price=10.0,
+                    total_amount=1000.0,
+                    transaction_date=date(2023, 1, 1),
+                ),
+                sell,
+            ]
+        )
+
+        assert calculator.calculate_code_gains(
+            transactions, "000001", current_prices
+        ) == (100.0, 100.0)
+
+        sell.quantity = 100
+        sell.total_amount = 1200.0
+
+        assert calculator.calculate_code_gains(
+            transactions, "000001", current_prices
+        ) == (200.0, 0.0)
+
     def test_calculate_code_current_value(self):
         """Test calculating current value for specific code."""
         calculator = HistoryCalculator()
@@ -460,8 +653,7 @@ class TestHistoryCalculator:
         assert realized == sell_gain
         assert unrealized == unrealized_gain
 
-    @pytest.mark.asyncio
-    async def test_calculate_complete_history(self):
+    def test_calculate_complete_history(self):
         """Test complete history calculation."""
         calculator = HistoryCalculator()
 
@@ -476,7 +668,7 @@ class TestHistoryCalculator:
         }
 
         transactions = TransactionList(transactions=self.setup_sample_data())
-        result = await calculator.calculate_complete_history(
+        result = calculator.calculate_complete_history(
             transactions, current_prices
         )
 
@@ -487,8 +679,7 @@ class TestHistoryCalculator:
         assert result.transaction_count == 4
         assert result.code is None  # Portfolio calculation
 
-    @pytest.mark.asyncio
-    async def test_calculate_single_investment_history(self):
+    def test_calculate_single_investment_history(self):
         """Test single investment history calculation."""
         calculator = HistoryCalculator()
 
@@ -505,7 +696,7 @@ class TestHistoryCalculator:
         transactions = TransactionList(
             transactions=self.setup_sample_data()
         ).filter_by_code("000001")
-        result = await calculator.calculate_single_investment_history(
+        result = calculator.calculate_single_investment_history(
             transactions, "000001", current_prices
         )
 
@@ -514,8 +705,7 @@ class TestHistoryCalculator:
         assert result.total_invested == 1000.00
         assert len(result.investments) == 1
 
-    @pytest.mark.asyncio
-    async def test_calculate_portfolio_history(self):
+    def test_calculate_portfolio_history(self):
         """Test portfolio history calculation."""
         calculator = HistoryCalculator()
 
@@ -536,7 +726,7 @@ class TestHistoryCalculator:
         }
 
         transactions = TransactionList(transactions=self.setup_sample_data())
-        result = await calculator.calculate_portfolio_history(
+        result = calculator.calculate_portfolio_history(
             transactions, current_prices
         )
 
@@ -97,12 +97,11 @@ class TestAnnualCalculator:
         calc = AnnualCalculator()
         assert calc is not None
 
-    @pytest.mark.asyncio
-    async def test_calculate_annual_returns_no_transactions(self):
+    def test_calculate_annual_returns_no_transactions(self):
         """Test annual returns with no transactions."""
         calc = AnnualCalculator()
         
-        result = await calc.calculate_annual_returns(
+        result = calc.calculate_annual_returns(
             pre_year_transactions=TransactionList(),
             year_transactions=TransactionList(),
             year=2023,
@@ -123,25 +122,23 @@ class TestHistoryCalculator:
         calc = HistoryCalculator()
         assert calc is not None
 
-    @pytest.mark.asyncio
-    async def test_calculate_history_empty_raises(self):
+    def test_calculate_history_empty_raises(self):
         """Test calculate_history with empty transactions raises ValueError."""
         calc = HistoryCalculator()
         
         with pytest.raises(ValueError, match="No transactions found"):
-            await calc.calculate_single_investment_history(
+            calc.calculate_single_investment_history(
                 transactions=TransactionList(),
                 code="000001",
                 current_prices={}
             )
 
-    @pytest.mark.asyncio
-    async def test_calculate_complete_history_empty_raises(self):
+    def test_calculate_complete_history_empty_raises(self):
         """Test calculate_complete_history with empty transactions raises ValueError."""
         calc = HistoryCalculator()
         
         with pytest.raises(ValueError, match="No transactions provided"):
-            await calc.calculate_complete_history(
+            calc.calculate_complete_history(
                 transactions=TransactionList(),
                 current_prices={}
             )
@@ -170,8 +170,7 @@ class TestPriceDataCache:
         )
         cache.add_price_data("000001", price)
         
-        assert "000001" in cache.cache
-        assert price.price_date in cache.cache["000001"]
+        assert ("000001", price.price_date) in cache.cache
 
     def test_get_price_data(self):
         """Test get_price_data."""
@@ -226,6 +225,7 @@ class TestPriceDataCache:
         
         cache.clear()
         assert cache.cache == {}
+        assert cache.get_latest_price_data("000001") is None
 
     def test_size(self):
         """Test size."""
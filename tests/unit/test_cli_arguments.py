@@ -3,6 +3,7 @@
 import pytest
 from unittest.mock import patch
 import sys
+from datetime import datetime
 
 from invest_ai.cli.arguments import (
     parse_arguments,
@@ -47,6 +48,20 @@ class TestParseArguments:
         args = parse_arguments(["--type", "stock", "--data", "test.yaml", "--verbose"])
         assert args.verbose is True
 
+    def test_parser_reused_across_calls(self):
+        """Test the parser is built once and repeat parses stay independent."""
+        with patch(
+            "invest_ai.cli.arguments.create_argument_parser",
+            wraps=create_argument_parser,
+        ) as create, patch("invest_ai.cli.arguments._PARSER", None):
+            first = parse_arguments(["--type", "stock", "--code", "000001"])
+            second = parse_arguments(["--type", "fund"])
+
+        assert create.call_count == 1
+        assert first.code == "000001"
+        assert second.code is None
+        assert second.data == "data/fund.yaml"
+
 
 class TestCreateArgumentParser:
     """Tests for create_argument_parser function."""
@@ -76,6 +91,24 @@ class TestValidateArguments:
         result = validate_arguments(args)
         assert result is False
 
+    def test_invalid_data_path_is_directory(self, tmp_path, capsys):
+        """Test validation with a directory as the data path."""
+        args = parse_arguments(["--type", "stock", "--data", str(tmp_path)])
+        result = validate_arguments(args)
+        assert result is False
+        assert "Data path is not a file" in capsys.readouterr().err
+
+    def test_invalid_data_path_under_file(self, tmp_path, capsys):
+        """Test validation with a data path nested under a regular file."""
+        test_file = tmp_path / "test.yaml"
+        test_file.write_text("transactions: []")
+        args = parse_arguments(
+            ["--type", "stock", "--data", str(test_file / "nested.yaml")]
+        )
+        result = validate_arguments(args)
+        assert result is False
+        assert "Data file does not exist" in capsys.readouterr().err
+
     def test_invalid_code_format(self, tmp_path):
         """Test validation with invalid code format."""
         test_file = tmp_path / "test.yaml"
@@ -105,6 +138,18 @@ class TestValidateArguments:
         result = validate_arguments(args)
         assert result is False
 
+    def test_year_after_import_year_is_accepted(self, tmp_path):
+        """Test a year that began after the module was imported is valid."""
+        test_file = tmp_path / "test.yaml"
+        test_file.write_text("transactions: []")
+        this_year = datetime.now().year
+
+        args = parse_arguments(
+            ["--type", "stock", "--data", str(test_file), "--year", str(this_year)]
+        )
+        with patch("invest_ai.cli.arguments._CURRENT_YEAR", this_year - 1):
+            assert validate_arguments(args) is True
+
 
 class TestGetUsageExamples:
     """Tests for get_usage_examples function."""
@@ -1,5 +1,8 @@
 """Additional tests for CLI module to boost coverage."""
 
+import asyncio
+import json
+
 import pytest
 from datetime import date
 from unittest.mock import Mock, patch, AsyncMock
@@ -12,6 +15,8 @@ from invest_ai.models import (
     TransactionType,
     AnnualResult,
     HistoryResult,
+    CalculationResult,
+    InvestmentType,
 )
 
 
@@ -28,25 +33,6 @@ class TestCLIController:
         assert controller.engine is not None
         assert controller.reporter is not None
 
-    def test_get_arg_from_dict(self):
-        """Test _get_arg with dict input."""
-        controller = CLIController()
-        args = {"type": "stock", "data": "test.yaml"}
-        
-        assert controller._get_arg(args, "type") == "stock"
-        assert controller._get_arg(args, "data") == "test.yaml"
-        assert controller._get_arg(args, "missing") is None
-        assert controller._get_arg(args, "missing", "default") == "default"
-
-    def test_get_arg_from_namespace(self):
-        """Test _get_arg with Namespace input."""
-        controller = CLIController()
-        args = argparse.Namespace(type="stock", data="test.yaml")
-        
-        assert controller._get_arg(args, "type") == "stock"
-        assert controller._get_arg(args, "data") == "test.yaml"
-        assert controller._get_arg(args, "missing") is None
-
     def test_convert_mock_prices_empty(self):
         """Test _convert_mock_prices with None/empty input."""
         controller = CLIController()
@@ -143,6 +129,63 @@ class TestMainFunction:
         captured = capsys.readouterr()
         assert "invest-ai" in captured.out
 
+    def test_main_no_args_skips_controller(self, monkeypatch):
+        """Test the help path returns before building the controller."""
+        monkeypatch.setattr("sys.argv", ["invest-ai"])
+
+        with patch("invest_ai.cli.main.CLIController") as controller_class:
+            assert main() == 0
+
+        controller_class.assert_not_called()
+
+    def test_main_runs_on_uvloop_when_available(self, monkeypatch):
+        """Test main uses uvloop's loop factory when it is installed."""
+        import invest_ai.cli.main as main_module
+
+        monkeypatch.setattr("sys.argv", ["invest-ai", "--help"])
+        monkeypatch.setattr("sys.platform", "linux")
+        fake_uvloop = Mock(new_event_loop=Mock(side_effect=asyncio.new_event_loop))
+        monkeypatch.setattr(main_module, "uvloop", fake_uvloop)
+        monkeypatch.setattr(main_module, "_UVLOOP_AVAILABLE", True)
+
+        with patch("invest_ai.cli.main.CLIController") as controller_class:
+            controller_class.return_value.run = AsyncMock(return_value=0)
+            assert main() == 0
+
+        fake_uvloop.new_event_loop.assert_called_once_with()
+
+
+class TestCLIControllerLazyCollaborators:
+    """Tests for lazily built CLIController collaborators."""
+
+    def test_price_fetcher_built_on_first_use(self):
+        """Test the price fetcher is created once, when first accessed."""
+        with patch("invest_ai.cli.main.PriceFetcher") as price_fetcher_class:
+            controller = CLIController()
+            price_fetcher_class.assert_not_called()
+
+            assert controller.price_fetcher is controller.price_fetcher
+            price_fetcher_class.assert_called_once_with()
+
+    def test_settings_loaded_once(self):
+        """Test controllers share one parsed Settings object."""
+        assert CLIController().settings is CLIController().settings
+
+    def test_close_skips_unbuilt_price_fetcher(self):
+        """Test closing does not build a price fetcher just to close it."""
+        with patch("invest_ai.cli.main.PriceFetcher") as price_fetcher_class:
+            CLIController().close()
+
+        price_fetcher_class.assert_not_called()
+
+    async def test_context_exit_closes_price_fetcher(self):
+        """Test leaving the context closes the price fetcher's sessions."""
+        with patch("invest_ai.cli.main.PriceFetcher") as price_fetcher_class:
+            async with CLIController() as controller:
+                assert controller.price_fetcher is price_fetcher_class.return_value
+
+        price_fetcher_class.return_value.close.assert_called_once_with()
+
 
 class TestCLIControllerDisplayResults:
     """Tests for display_results method."""
@@ -208,3 +251,226 @@ class TestCLIControllerDisplayResults:
         
         # Should handle None result
         await controller.display_results(None, args)
+
+    @pytest.mark.asyncio
+    async def test_display_results_json_history_with_investments(self, capsys):
+        """Test JSON output serializes dates, enums and nested results."""
+        controller = CLIController()
+        result = HistoryResult(
+            first_investment=date(2020, 1, 2),
+            last_transaction=date(2023, 12, 29),
+            total_invested=1000,
+            current_value=1150,
+            total_gain=150,
+            return_rate=15.0,
+            investments=[
+                CalculationResult(
+                    code="000001",
+                    investment_type=InvestmentType.STOCK,
+                    realized_gain=0,
+                    total_gain=150,
+                    cost_basis=1000,
+                    total_invested=1000,
+                    current_value=1150,
+                    return_rate=15.0,
+                )
+            ],
+        )
+
+        args = argparse.Namespace(format="json", year=None, code=None, type=None)
+
+        await controller.display_results(result, args)
+
+        output = json.loads(capsys.readouterr().out)
+        assert output["first_investment"] == "2020-01-02"
+        assert output["investments"][0]["investment_type"] == "stock"
+        assert output["total_gain"] == 150.0
+
+
+# Captured at import, before the autouse fixture patches it out
+_fetch_annual_prices = CLIController._fetch_annual_prices
+
+
+class TestFetchAnnualPrices:
+    """Tests for CLIController._fetch_annual_prices."""
+
+    @pytest.mark.asyncio
+    async def test_stock_prices_fetched_concurrently_within_rate_limit(self, capsys):
+        """Test stock requests overlap but stay within the per-second limit."""
+        import asyncio
+
+        from invest_ai.models import InvestmentType, PriceData
+
+        in_flight = 0
+        peak = 0
+
+        async def fetch_stock_price(code, target_date):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if code == "600000" and target_date.year == 2022:
+                raise RuntimeError("no data")
+            return PriceData(
+                code=code, price_date=target_date, price_value=10.0, source="tushare"
+            )
+
+        controller = CLIController()
+        tushare_client = Mock()
+        tushare_client.config.tushare.rate_limit_per_minute = 120
+        tushare_client.fetch_stock_price = fetch_stock_price
+        tushare_client.fetch_stock_prices_bulk = AsyncMock(return_value={})
+        controller.price_fetcher = Mock()
+        controller.price_fetcher.is_available.return_value = True
+        controller.price_fetcher.tushare_client = tushare_client
+
+        prices = await _fetch_annual_prices(
+            controller, ["000001", "600000", "300750"], 2023, InvestmentType.STOCK
+        )
+
+        assert peak == 2
+        assert set(prices["year_start"]) == {"000001", "300750"}
+        assert set(prices["year_end"]) == {"000001", "600000", "300750"}
+        assert "year-start price for 600000" in capsys.readouterr().err
+
+    @pytest.mark.asyncio
+    async def test_stock_bulk_prices_with_per_code_fallback(self):
+        """Test bulk results are used and only missing codes go per code."""
+        from invest_ai.models import InvestmentType, PriceData
+
+        def price(code, target_date):
+            return PriceData(
+                code=code, price_date=target_date, price_value=10.0, source="tushare"
+            )
+
+        async def fetch_stock_prices_bulk(codes, target_date):
+            return {
+                code: price(code, target_date) for code in codes if code != "600000"
+            }
+
+        controller = CLIController()
+        tushare_client = Mock()
+        tushare_client.config.tushare.rate_limit_per_minute = 60
+        tushare_client.fetch_stock_prices_bulk = AsyncMock(
+            side_effect=fetch_stock_prices_bulk
+        )
+        tushare_client.fetch_stock_price = AsyncMock(side_effect=price)
+        controller.price_fetcher = Mock()
+        controller.price_fetcher.is_available.return_value = True
+        controller.price_fetcher.tushare_client = tushare_client
+
+        prices = await _fetch_annual_prices(
+            controller, ["000001", "600000"], 2023, InvestmentType.STOCK
+        )
+
+        assert tushare_client.fetch_stock_prices_bulk.await_count == 2
+        assert [
+            call.args[0] for call in tushare_client.fetch_stock_price.await_args_list
+        ] == ["600000", "600000"]
+        assert set(prices["year_start"]) == {"000001", "600000"}
+        assert set(prices["year_end"]) == {"000001", "600000"}
+
+    @pytest.mark.asyncio
+    async def test_fund_prices_filed_by_label(self, capsys):
+        """Test fund NAVs land under the date they were fetched for."""
+        from invest_ai.models import InvestmentType, NavData
+
+        async def fetch_fund_nav(code, target_date):
+            if code == "110022" and target_date.year == 2023:
+                raise RuntimeError("no nav")
+            return NavData(
+                code=code,
+                nav_date=target_date,
+                nav=1.0 + target_date.year - 2022,
+                accumulated_nav=1.0,
+            )
+
+        controller = CLIController()
+        controller.price_fetcher = Mock()
+        controller.price_fetcher.is_available.return_value = True
+        controller.price_fetcher.eastmoney_client.fetch_fund_nav = fetch_fund_nav
+
+        prices = await _fetch_annual_prices(
+            controller, ["510300", "110022"], 2023, InvestmentType.FUND
+        )
+
+        assert {code: p.price_value for code, p in prices["year_start"].items()} == {
+            "510300": 1.0,
+            "110022": 1.0,
+        }
+        assert {code: p.price_value for code, p in prices["year_end"].items()} == {
+            "510300": 2.0
+        }
+        assert "year_end price for 110022" in capsys.readouterr().err
+
+
+class TestGetCurrentPrices:
+    """Tests for CLIController._get_current_prices."""
+
+    def test_uses_shared_clients(self, capsys):
+        """Test prices come from the controller's own clients."""
+        from invest_ai.models import PriceData
+
+        controller = CLIController()
+        tushare_client = Mock()
+        tushare_client.fetch_stock_price = AsyncMock(
+            return_value=PriceData(
+                code="000001",
+                price_date=date.today(),
+                price_value=12.5,
+                source="tushare",
+            )
+        )
+        eastmoney_client = Mock()
+        eastmoney_client.fetch_fund_nav = AsyncMock(
+            side_effect=RuntimeError("no nav")
+        )
+        controller.price_fetcher = Mock(
+            tushare_client=tushare_client, eastmoney_client=eastmoney_client
+        )
+
+        with patch("invest_ai.cli.main.PriceFetcher") as price_fetcher_class:
+            prices = controller._get_current_prices(["000001", "510300", "AAPL"])
+
+        price_fetcher_class.assert_not_called()
+        assert prices == {"000001": 12.5, "510300": 100.0, "AAPL": 100.0}
+        tushare_client.fetch_stock_price.assert_awaited_once_with(
+            "000001", date.today()
+        )
+        assert "Failed to fetch price for 510300" in capsys.readouterr().err
+
+    def test_stock_skipped_without_tushare(self):
+        """Test stocks get no price when Tushare is not configured."""
+        controller = CLIController()
+        controller.price_fetcher = Mock(tushare_client=None)
+
+        assert controller._get_current_prices(["600000"]) == {}
+
+    def test_routes_codes_by_prefix(self):
+        """Test each code goes to the source its leading digit selects."""
+        controller = CLIController()
+        tushare_client = Mock()
+        tushare_client.fetch_stock_price = AsyncMock(
+            return_value=Mock(price_value=10.0)
+        )
+        eastmoney_client = Mock()
+        eastmoney_client.fetch_fund_nav = AsyncMock(return_value=Mock(nav=1.5))
+        controller.price_fetcher = Mock(
+            tushare_client=tushare_client, eastmoney_client=eastmoney_client
+        )
+
+        prices = controller._get_current_prices(
+            ["000001", "00700", "300750", "600000", "510300", "110022", "1234", "AAPL"]
+        )
+
+        assert prices == {
+            "000001": 10.0,
+            "00700": 10.0,
+            "300750": 10.0,
+            "600000": 10.0,
+            "510300": 1.5,
+            "110022": 1.5,
+            "1234": 100.0,
+            "AAPL": 100.0,
+        }
@@ -4,8 +4,10 @@ import pytest
 import os
 from unittest.mock import patch
 
+from pydantic import ValidationError
+
 from invest_ai.config.settings import load_settings, Settings
-from invest_ai.config.api_config import create_api_config
+from invest_ai.config.api_config import MAX_RETRY_DELAY, backoff_delay, create_api_config
 
 
 class TestSettings:
@@ -32,6 +34,12 @@ class TestSettings:
         settings = load_settings()
         assert isinstance(settings.tushare_configured, bool)
 
+    def test_shared_settings_are_frozen(self):
+        """Test the shared settings instance cannot be mutated."""
+        settings = load_settings()
+        with pytest.raises(ValidationError):
+            settings.debug = True
+
 
 class TestApiConfig:
     """Tests for ApiConfig class."""
@@ -50,3 +58,18 @@ class TestApiConfig:
         """Test API config has eastmoney settings."""
         config = create_api_config()
         assert hasattr(config, 'eastmoney')
+
+    def test_backoff_delay_grows_with_jitter_and_cap(self):
+        """Test backoff delay is jittered around the exponential step and capped."""
+        for attempt in range(4):
+            delay = backoff_delay(1.0, attempt)
+            assert 0.5 * 2**attempt <= delay <= 1.5 * 2**attempt
+
+        assert backoff_delay(1.0, 20) <= MAX_RETRY_DELAY
+
+    def test_backoff_delay_cap_holds_at_maximum_jitter(self):
+        """Test the cap bounds the wait even when jitter rounds up."""
+        with patch("invest_ai.config.api_config.random.uniform", return_value=1.5):
+            assert backoff_delay(1.0, 4) == 24.0
+            assert backoff_delay(1.0, 5) == MAX_RETRY_DELAY
+            assert backoff_delay(1.0, 20) == MAX_RETRY_DELAY
@@ -3,6 +3,7 @@
 import pytest
 from datetime import date
 
+from invest_ai.calculation._fifo_kernel import allocate_many
 from invest_ai.calculation.fifo import FifoCalculator
 from invest_ai.models import (
     Transaction,
@@ -161,6 +162,162 @@ class TestFifoCalculatorCoverage:
         assert result is not None
         assert result.cost_basis == 500  # 50 * 10
 
+    def test_allocate_sales_matches_allocate_cost(self):
+        """Test the batch allocator agrees with per-sale allocate_cost."""
+        calc = FifoCalculator()
+        positions = [
+            Transaction(
+                code="000001",
+                type=TransactionType.BUY,
+                quantity=100,
+                unit_price=10.0,
+                total_amount=1000,
+                transaction_date=date(2023, 1, 15)
+            ),
+            Transaction(
+                code="000001",
+                type=TransactionType.BUY,
+                quantity=50,
+                unit_price=12.0,
+                total_amount=600,
+                transaction_date=date(2023, 2, 15)
+            ),
+            Transaction(
+                code="000001",
+                type=TransactionType.DIVIDEND,
+                quantity=10,
+                total_amount=0,
+                transaction_date=date(2023, 3, 1)
+            ),
+        ]
+        sells = [
+            Transaction(
+                code="000001",
+                type=TransactionType.SELL,
+                quantity=120,
+                unit_price=15.0,
+                total_amount=1800,
+                transaction_date=date(2023, 4, 1)
+            ),
+            # Cannot be covered by the 40 shares left, so it is skipped
+            Transaction(
+                code="000001",
+                type=TransactionType.SELL,
+                quantity=100,
+                unit_price=15.0,
+                total_amount=1500,
+                transaction_date=date(2023, 5, 1)
+            ),
+        ]
+
+        realized, remaining_shares, remaining_cost = calc.allocate_sales(
+            positions, sells
+        )
+
+        queue = calc.process_fifo_queue(positions)
+        expected_realized = 0.0
+        for sell_tx in sells:
+            try:
+                result = calc.allocate_cost(sell_tx, queue)
+            except ValueError:
+                continue
+            expected_realized += sell_tx.total_amount - result.cost_basis
+            queue = result.remaining_queue
+
+        assert realized == expected_realized == 1800 - (100 * 10 + 20 * 12)
+        assert remaining_shares == queue.get_total_quantity() == 40
+        assert remaining_cost == queue.get_total_cost_basis() == 30 * 12
+
+    def test_process_multiple_sales_skips_oversell(self):
+        """Test an uncoverable sale yields an empty result and later sales proceed."""
+        calc = FifoCalculator()
+        transactions = [
+            Transaction(
+                code="000001",
+                type=TransactionType.BUY,
+                quantity=100,
+                unit_price=10.0,
+                total_amount=1000,
+                transaction_date=date(2023, 1, 1)
+            ),
+            Transaction(
+                code="000001",
+                type=TransactionType.SELL,
+                quantity=500,
+                unit_price=12.0,
+                total_amount=6000,
+                transaction_date=date(2023, 2, 1)
+            ),
+            Transaction(
+                code="000001",
+                type=TransactionType.SELL,
+                quantity=40,
+                unit_price=12.0,
+                total_amount=480,
+                transaction_date=date(2023, 3, 1)
+            ),
+        ]
+
+        results, queue = calc.process_multiple_sales(transactions)
+
+        assert len(results) == 2
+        assert results[0].allocated_purchases == []
+        assert results[0].cost_basis == 0.0
+        assert results[0].code == "000001"
+        assert results[1].cost_basis == 400
+        assert queue.get_total_quantity() == 60
+
+    def test_plain_lists_out_of_date_order(self):
+        """Test plain-list inputs are put in date order before FIFO runs."""
+        calc = FifoCalculator()
+        later_buy = Transaction(
+            code="000001",
+            type=TransactionType.BUY,
+            quantity=100,
+            unit_price=20.0,
+            total_amount=2000,
+            transaction_date=date(2023, 6, 1)
+        )
+        earlier_buy = Transaction(
+            code="000001",
+            type=TransactionType.BUY,
+            quantity=100,
+            unit_price=10.0,
+            total_amount=1000,
+            transaction_date=date(2023, 1, 1)
+        )
+        sell = Transaction(
+            code="000001",
+            type=TransactionType.SELL,
+            quantity=100,
+            unit_price=25.0,
+            total_amount=2500,
+            transaction_date=date(2023, 7, 1)
+        )
+
+        queue = calc.process_fifo_queue([later_buy, earlier_buy])
+        assert calc.allocate_cost(sell, queue).cost_basis == 1000
+
+        realized, _, remaining_cost = calc.allocate_sales(
+            [later_buy, earlier_buy], [sell]
+        )
+        assert realized == 1500
+        assert remaining_cost == 2000
+
+        early_sell = sell.model_copy(update={"transaction_date": date(2023, 2, 1)})
+        assert calc.validate_fifo_processing([early_sell, earlier_buy]) == []
+
+    def test_allocate_many_kernel(self):
+        """Test the scalar kernel skips uncoverable sales and advances head."""
+        quantities = [100.0, 50.0, 10.0]
+        prices = [10.0, 12.0, 0.0]
+
+        costs, head = allocate_many(quantities, prices, [120.0, 500.0, 30.0])
+
+        assert costs == [100 * 10 + 20 * 12, None, 30 * 12]
+        assert head == 2
+        assert quantities == [0.0, 0.0, 10.0]
+
 
 class TestFifoQueueOperations:
     """Additional tests for FifoQueue operations."""
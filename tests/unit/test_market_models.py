@@ -12,6 +12,7 @@ from invest_ai.market.models import (
     InvestmentInfo,
     PriceQuery,
 )
+from invest_ai.market.file_cache import RECENT_TTL_SECONDS, FileCache
 
 
 class TestMarketDataCache:
@@ -102,6 +103,142 @@ class TestMarketDataCache:
         
         assert cache.size() == 3
 
+    def test_evicts_least_recently_used(self):
+        """Test a full cache drops the entry read or written longest ago."""
+        cache = MarketDataCache(maxsize=2)
+        day = date(2023, 1, 15)
+        for code in ("000001", "000002"):
+            cache.set(code, day, "tushare", PriceData(
+                code=code, price_date=day, price_value=10.0, source="tushare"
+            ))
+
+        assert cache.get("000001", day, "tushare") is not None
+        cache.set("000003", day, "tushare", PriceData(
+            code="000003", price_date=day, price_value=10.0, source="tushare"
+        ))
+
+        assert cache.size() == 2
+        assert cache.get("000002", day, "tushare") is None
+        assert cache.get("000001", day, "tushare") is not None
+
+
+class TestFileCache:
+    """Tests for the on-disk FileCache."""
+
+    def test_round_trip(self, tmp_path):
+        """Test a stored value is returned for the same key only."""
+        cache = FileCache(tmp_path / "prices")
+        value = {"code": "000001", "price_date": "2023-01-06", "price_value": 12.5}
+        cache.set("000001", date(2023, 1, 8), "tushare", value)
+
+        assert cache.get("000001", date(2023, 1, 8), "tushare") == value
+        assert cache.get("000001", date(2023, 1, 8), "eastmoney") is None
+        assert cache.get("000002", date(2023, 1, 8), "tushare") is None
+
+    def test_past_dates_never_expire(self, tmp_path):
+        """Test historical entries survive far beyond the recent TTL."""
+        cache = FileCache(tmp_path)
+        cache.set("000001", date(2023, 1, 6), "tushare", {"price_value": 1.0})
+
+        with patch("invest_ai.market.file_cache.time.time", return_value=4e9):
+            assert cache.get("000001", date(2023, 1, 6), "tushare") is not None
+
+    def test_recent_dates_expire(self, tmp_path):
+        """Test entries for today expire after the short TTL."""
+        cache = FileCache(tmp_path)
+        today = date.today()
+        cache.set("000001", today, "tushare", {"price_value": 1.0})
+        assert cache.get("000001", today, "tushare") is not None
+
+        stale_time = datetime.now().timestamp() + RECENT_TTL_SECONDS + 1
+        with patch("invest_ai.market.file_cache.time.time", return_value=stale_time):
+            assert cache.get("000001", today, "tushare") is None
+
+    def test_recent_ttl_is_configurable(self, tmp_path):
+        """Test recent entries honour the TTL given to the cache."""
+        cache = FileCache(tmp_path, recent_ttl=3600)
+        today = date.today()
+        cache.set("000001", today, "tushare", {"price_value": 1.0})
+
+        later = datetime.now().timestamp() + RECENT_TTL_SECONDS + 1
+        with patch("invest_ai.market.file_cache.time.time", return_value=later):
+            assert cache.get("000001", today, "tushare") is not None
+        with patch(
+            "invest_ai.market.file_cache.time.time", return_value=later + 3600
+        ):
+            assert cache.get("000001", today, "tushare") is None
+
+    def test_settings_default_matches_recent_ttl(self):
+        """Test the configured default TTL agrees with the cache's own default."""
+        from invest_ai.config.settings import Settings
+
+        assert Settings.model_fields["cache_ttl"].default == RECENT_TTL_SECONDS
+
+    def test_repeat_lookups_served_from_memory(self, tmp_path):
+        """Test entries stay available in process without rereading files."""
+        writer = FileCache(tmp_path)
+        writer.set("000001", date(2023, 1, 6), "tushare", {"price_value": 1.0})
+
+        reader = FileCache(tmp_path)
+        assert reader.get("000001", date(2023, 1, 6), "tushare") is not None
+        writer._path("000001", date(2023, 1, 6), "tushare").unlink()
+        assert reader.get("000001", date(2023, 1, 6), "tushare") == {
+            "price_value": 1.0
+        }
+
+    def test_todays_entry_does_not_become_permanent(self, tmp_path):
+        """Test a quote cached for today still expires once the date is old.
+
+        The expiry is fixed at write time, so two days later the entry is
+        not reclassified as a final historical price.
+        """
+        cache = FileCache(tmp_path)
+        today = date.today()
+        cache.set(
+            "000001",
+            today,
+            "tushare",
+            {"price_value": 1.0},
+            value_date=today - timedelta(days=1),
+        )
+
+        two_days_later = datetime.now().timestamp() + 2 * 86400
+        with patch(
+            "invest_ai.market.file_cache.time.time", return_value=two_days_later
+        ):
+            assert cache.get("000001", today, "tushare") is None
+            assert FileCache(tmp_path).get("000001", today, "tushare") is None
+
+    def test_fallback_for_past_date_expires(self, tmp_path):
+        """Test a value taken from an earlier day is not kept for good."""
+        cache = FileCache(tmp_path)
+        cache.set(
+            "000001",
+            date(2023, 12, 31),
+            "tushare",
+            {"price_value": 1.0},
+            value_date=date(2023, 12, 29),
+        )
+        assert FileCache(tmp_path).get("000001", date(2023, 12, 31), "tushare")
+
+        later = datetime.now().timestamp() + RECENT_TTL_SECONDS + 1
+        with patch("invest_ai.market.file_cache.time.time", return_value=later):
+            assert cache.get("000001", date(2023, 12, 31), "tushare") is None
+
+    def test_entry_without_expiry_is_a_miss(self, tmp_path):
+        """Test files written before expiries were stored are ignored."""
+        cache = FileCache(tmp_path)
+        cache._path("000001", date(2023, 1, 6), "tushare").write_text(
+            '{"cached_at": 0, "value": {"price_value": 1.0}}'
+        )
+        assert cache.get("000001", date(2023, 1, 6), "tushare") is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        """Test an unreadable cache file is treated as a miss."""
+        cache = FileCache(tmp_path)
+        cache._path("000001", date(2023, 1, 6), "tushare").write_text("{not json")
+        assert cache.get("000001", date(2023, 1, 6), "tushare") is None
+
 
 class TestPriceFetcherConfig:
     """Tests for PriceFetcherConfig class."""
@@ -264,6 +401,16 @@ class TestPriceQuery:
         assert query.codes == ["000001", "000002", "000003"]
         assert query.dates == [date(2023, 1, 1), date(2023, 2, 1), date(2023, 3, 1)]
 
+    def test_init_leaves_caller_lists_alone(self):
+        """Test that init does not reorder the lists it was given."""
+        codes = ["000003", "000001"]
+        dates = [date(2023, 3, 1), date(2023, 1, 1)]
+
+        PriceQuery(codes=codes, dates=dates, investment_type=InvestmentType.STOCK)
+
+        assert codes == ["000003", "000001"]
+        assert dates == [date(2023, 3, 1), date(2023, 1, 1)]
+
     def test_total_requests(self):
         """Test total_requests property."""
         query = PriceQuery(
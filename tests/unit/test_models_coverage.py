@@ -115,6 +115,13 @@ class TestTransaction:
         tx2 = Transaction(code="110022", type=TransactionType.BUY, total_amount=1000)
         assert tx2.get_investment_type() == InvestmentType.FUND
 
+    def test_classify_code(self):
+        """Test classify_code matches get_investment_type without an instance."""
+        assert Transaction.classify_code("510050") == InvestmentType.FUND
+        assert Transaction.classify_code("110022") == InvestmentType.FUND
+        assert Transaction.classify_code("600001") == InvestmentType.STOCK
+        assert Transaction.classify_code("") == InvestmentType.STOCK
+
     def test_date_property(self):
         """Test date property getter and setter."""
         tx = Transaction(code="000001", type=TransactionType.BUY, total_amount=1000)
@@ -151,6 +158,41 @@ class TestTransactionList:
         tx_list.append(tx)
         assert len(tx_list) == 1
 
+    def test_kept_in_date_order(self):
+        """Test construction and append keep transactions sorted by date."""
+        jan = Transaction(code="000001", type=TransactionType.BUY, total_amount=1, date=date(2023, 1, 1))
+        feb = Transaction(code="000002", type=TransactionType.BUY, total_amount=1, date=date(2023, 2, 1))
+        mar = Transaction(code="000001", type=TransactionType.SELL, total_amount=1, date=date(2023, 3, 1))
+
+        tx_list = TransactionList(transactions=[mar, jan])
+        assert tx_list.transactions == [jan, mar]
+
+        tx_list.append(feb)
+        assert tx_list.transactions == [jan, feb, mar]
+
+    def test_code_lookups_follow_list_edits(self):
+        """Test code lookups see appends and in-place edits of the list."""
+        tx1 = Transaction(code="000001", type=TransactionType.BUY, total_amount=1, date=date(2023, 1, 1))
+        tx2 = Transaction(code="000002", type=TransactionType.BUY, total_amount=1, date=date(2023, 2, 1))
+        tx3 = Transaction(code="000003", type=TransactionType.SELL, total_amount=1, date=date(2023, 3, 1))
+        tx_list = TransactionList(transactions=[tx1, tx2])
+
+        assert tx_list.filter_by_code("000001").transactions == [tx1]
+        assert tx_list.get_codes() == {"000001", "000002"}
+
+        tx_list.append(tx3)
+        assert tx_list.get_codes() == {"000001", "000002", "000003"}
+        assert tx_list.filter_by_code("000003").transactions == [tx3]
+
+        # Same-length edits of the public list
+        tx_list.transactions[1] = tx3
+        assert tx_list.get_codes() == {"000001", "000003"}
+        assert tx_list.filter_by_code("000002").transactions == []
+
+        tx_list.transactions = [tx1, tx2]
+        assert tx_list.get_codes() == {"000001", "000002"}
+        assert tx_list.filter_by_code("000002").transactions == [tx2]
+
     def test_extend(self):
         """Test extend method."""
         tx_list = TransactionList()
@@ -1,10 +1,21 @@
 """Unit tests for XIRR calculation."""
 
 from datetime import date
+from unittest.mock import patch
 
 import pytest
 
+from invest_ai.calculation import xirr as xirr_module
+from invest_ai.calculation._xirr_kernel import (
+    bisection_xirr,
+    initial_guess,
+    newton_xirr,
+    npv,
+    npv_and_derivative,
+    secant_xirr,
+)
 from invest_ai.calculation.xirr import (
+    _calculate_xirr_cached,
     build_annual_cashflows,
     build_history_cashflows,
     calculate_xirr,
@@ -106,6 +117,237 @@ class TestCalculateXIRR:
         assert 9.5 < result < 10.5
 
 
+    def test_two_cashflows_closed_form(self) -> None:
+        """Test two cash flows give the exact compound annual rate."""
+        cashflows = [
+            (date(2024, 1, 1), -10000),
+            (date(2024, 7, 1), 10500),
+        ]
+        expected = (1.05 ** (365 / 182) - 1) * 100
+        assert calculate_xirr(cashflows) == pytest.approx(expected, rel=1e-12)
+
+        years = [0.0, 182 / 365]
+        solved = secant_xirr([-10000.0, 10500.0], years, 100, 1e-6)
+        assert solved is not None
+        assert calculate_xirr(cashflows) == pytest.approx(solved * 100, abs=1e-4)
+
+    def test_two_cashflows_same_day_uses_solvers(self) -> None:
+        """Test two cash flows on one date fall back to the solvers."""
+        cashflows = [
+            (date(2024, 1, 1), -10000),
+            (date(2024, 1, 1), 10500),
+        ]
+        assert calculate_xirr(cashflows) == 0.0
+
+    def test_two_cashflows_rate_above_bound(self) -> None:
+        """Test a closed-form rate beyond the bracket gives 0.0."""
+        cashflows = [
+            (date(2024, 1, 1), -1),
+            (date(2024, 1, 2), 1e6),
+        ]
+        assert calculate_xirr(cashflows) == 0.0
+
+
+    def test_repeat_cashflows_are_memoized(self) -> None:
+        """Test identical cash flows reuse the cached result."""
+        _calculate_xirr_cached.cache_clear()
+        cashflows = [
+            (date(2024, 1, 1), -10000),
+            (date(2024, 6, 15), -5000),
+            (date(2024, 12, 31), 16500),
+        ]
+        first = calculate_xirr(cashflows)
+        second = calculate_xirr(list(reversed(cashflows)))
+        assert second == first
+        info = _calculate_xirr_cached.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+
+class TestNativeBackend:
+    """Tests for the optional pyxirr backend."""
+
+    CASHFLOWS = [
+        (date(2024, 1, 1), -10000),
+        (date(2024, 6, 15), -5000),
+        (date(2024, 12, 31), 16500),
+    ]
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self) -> None:
+        _calculate_xirr_cached.cache_clear()
+
+    def test_uses_pyxirr_when_available(self, monkeypatch) -> None:
+        """Test the native backend is used and given real dates."""
+        calls = []
+
+        def fake_xirr(dates, amounts, guess):
+            calls.append((dates, amounts))
+            return 0.125
+
+        monkeypatch.setattr(xirr_module, "_PYXIRR_AVAILABLE", True)
+        monkeypatch.setattr(xirr_module, "_pyxirr", fake_xirr)
+
+        assert calculate_xirr(self.CASHFLOWS) == pytest.approx(12.5)
+        assert calls == [
+            (
+                [date(2024, 1, 1), date(2024, 6, 15), date(2024, 12, 31)],
+                [-10000.0, -5000.0, 16500.0],
+            )
+        ]
+
+    @pytest.mark.parametrize("outcome", [None, 50.0, ValueError("bad")])
+    def test_falls_back_to_pure_python(self, monkeypatch, outcome) -> None:
+        """Test failures and out-of-bracket roots use the built-in solvers."""
+        expected = calculate_xirr(self.CASHFLOWS)
+        _calculate_xirr_cached.cache_clear()
+
+        def fake_xirr(dates, amounts, guess):
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        monkeypatch.setattr(xirr_module, "_PYXIRR_AVAILABLE", True)
+        monkeypatch.setattr(xirr_module, "_pyxirr", fake_xirr)
+
+        assert calculate_xirr(self.CASHFLOWS) == expected
+
+
+class TestXirrKernels:
+    """Tests for the secant, Newton and bisection XIRR kernels."""
+
+    AMOUNTS = [-10000.0, -5000.0, 16500.0]
+    YEARS = [0.0, 182 / 365.0, 366 / 365.0]
+
+    def test_secant_and_bisection_agree(self) -> None:
+        """Test both solvers find the same root."""
+        secant = secant_xirr(self.AMOUNTS, self.YEARS, 100, 1e-9)
+        bisection = bisection_xirr(self.AMOUNTS, self.YEARS, 1e-9)
+
+        assert secant is not None
+        assert secant == pytest.approx(bisection, abs=1e-6)
+        neg_years = [-yr for yr in self.YEARS]
+        assert npv(secant, self.AMOUNTS, neg_years) == pytest.approx(0.0, abs=1e-4)
+
+    def test_secant_returns_none_without_convergence(self) -> None:
+        """Test the secant method reports failure so the caller can fall back."""
+        assert secant_xirr(self.AMOUNTS, self.YEARS, 0, 1e-9) is None
+
+    def test_initial_guess_from_money_multiple(self) -> None:
+        """Test the seed follows the money multiple and stays clamped."""
+        assert initial_guess([-100.0, 121.0], [0.0, 2.0]) == pytest.approx(0.1)
+        assert initial_guess([-100.0, 1e9], [0.0, 0.01]) == pytest.approx(5.0)
+        assert initial_guess([-100.0, 1.0], [0.0, 0.01]) == pytest.approx(-0.5)
+        assert initial_guess([-100.0, -50.0], [0.0, 1.0]) == 0.1
+
+    def test_large_gain_converges_from_guess(self) -> None:
+        """Test a rate far from 10% is found by both iterative solvers."""
+        amounts = [-1000.0, -500.0, 9000.0]
+        years = [0.0, 0.5, 1.5]
+        secant = secant_xirr(amounts, years, 100, 1e-9)
+        newton = newton_xirr(amounts, years, 100, 1e-9)
+
+        assert secant is not None
+        assert newton is not None
+        assert secant == pytest.approx(bisection_xirr(amounts, years, 1e-9))
+        assert newton == pytest.approx(secant, abs=1e-6)
+
+    def test_npv_and_derivative_fused(self) -> None:
+        """Test the fused pass matches NPV and a numeric derivative."""
+        rate, step = 0.07, 1e-6
+        neg_years = [-yr for yr in self.YEARS]
+        value, derivative = npv_and_derivative(rate, self.AMOUNTS, neg_years)
+
+        assert value == pytest.approx(npv(rate, self.AMOUNTS, neg_years))
+        numeric = (
+            npv(rate + step, self.AMOUNTS, neg_years)
+            - npv(rate - step, self.AMOUNTS, neg_years)
+        ) / (2 * step)
+        assert derivative == pytest.approx(numeric, rel=1e-6)
+
+    @pytest.mark.parametrize(
+        ("amounts", "years"),
+        [
+            # Steady losses: secant steps through -0.99 and stalls there
+            (
+                [-5000.0, -5000.0, -5000.0, 9000.0],
+                [0.0, 730 / 365, 1461 / 365, 2922 / 365],
+            ),
+            # Near-total loss: the root lies below the -99% bound
+            ([-10000.0, 10.0], [0.0, 60 / 365]),
+            # No sign change in NPV at all
+            ([-100.0, -50.0], [0.0, 1.0]),
+        ],
+    )
+    def test_iterative_solvers_never_report_a_false_root(
+        self, amounts: list[float], years: list[float]
+    ) -> None:
+        """Test secant and Newton either match bisection or defer to it."""
+        bisection = bisection_xirr(amounts, years, 1e-6)
+
+        for solver in (secant_xirr, newton_xirr):
+            rate = solver(amounts, years, 100, 1e-6)
+            assert rate is None or rate == pytest.approx(bisection, abs=1e-5)
+
+    def test_secant_gives_up_when_leaving_bracket(self) -> None:
+        """Test secant stops early when every step overshoots the bracket."""
+        neg_years_seen = []
+
+        def counting_npv(rate, amounts, neg_years):
+            neg_years_seen.append(neg_years)
+            return npv(rate, amounts, neg_years)
+
+        with patch(
+            "invest_ai.calculation._xirr_kernel.npv", side_effect=counting_npv
+        ):
+            rate = secant_xirr([-10000.0, 10.0], [0.0, 60 / 365], 100, 1e-6)
+
+        assert rate is None
+        assert len(neg_years_seen) < 10
+
+    def test_bisection_reaches_float_precision_near_zero(self) -> None:
+        """Test bit-level bisection resolves a tiny root with zero tolerance."""
+        rate = bisection_xirr([-100.0, 100.0000001], [0.0, 1.0], 0.0)
+
+        assert rate == pytest.approx(1e-9, abs=1e-15)
+
+    def test_bisection_without_sign_change(self) -> None:
+        """Test bisection returns 0.0 when the bracket holds no root."""
+        assert bisection_xirr([-100.0, -50.0], [0.0, 1.0], 1e-6) == 0.0
+
+
+class TestCalculateXIRRRegressions:
+    """Regression tests for solver false convergence."""
+
+    def test_loss_with_spread_buys(self) -> None:
+        """Test a multi-year loss gives the true negative rate."""
+        cashflows = [
+            (date(2016, 1, 1), -5000),
+            (date(2018, 1, 1), -5000),
+            (date(2020, 1, 1), -5000),
+            (date(2024, 1, 1), 9000),
+        ]
+        assert calculate_xirr(cashflows) == pytest.approx(-8.31, abs=0.01)
+
+    def test_root_below_bound_returns_zero(self) -> None:
+        """Test no rate is reported when no root lies in the search bracket."""
+        cashflows = [
+            (date(2020, 1, 1), -10000),
+            (date(2020, 3, 1), 10),
+        ]
+        assert calculate_xirr(cashflows) == 0.0
+
+    def test_dividend_before_buys_uses_newton_fallback(self) -> None:
+        """Test a root bisection cannot bracket is still found."""
+        cashflows = [
+            (date(2016, 9, 20), 2386.45),
+            (date(2018, 7, 21), -5848.94),
+            (date(2020, 11, 9), -5771.18),
+            (date(2022, 5, 19), -3756.25),
+            (date(2023, 6, 5), 11233.03),
+        ]
+        assert calculate_xirr(cashflows) == pytest.approx(-5.86, abs=0.01)
+
+
 class TestBuildAnnualCashflows:
     """Tests for build_annual_cashflows function."""
 
@@ -225,3 +467,21 @@ class TestBuildHistoryCashflows:
         assert len(result) == 2
         assert (date(2023, 1, 15), -10000) in result
         assert (date(2024, 6, 1), 12000) in result
+
+    def test_accepts_generator(self) -> None:
+        """Test transactions can be streamed from a generator."""
+        transactions = [
+            (date(2023, 1, 15), "BUY", 10000),
+            (date(2024, 6, 1), "SELL", 12000),
+        ]
+        result = build_history_cashflows(
+            transactions=(tx for tx in transactions),
+            end_date=date(2024, 12, 31),
+            current_value=500,
+        )
+
+        assert result == [
+            (date(2023, 1, 15), -10000),
+            (date(2024, 6, 1), 12000),
+            (date(2024, 12, 31), 500),
+        ]